@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+generate_news.py のオフラインベンチマーク
+DVB・Google翻訳には接続せず、記録済みフィード／記事HTMLをローカルHTTPサーバから配信し、
+遅延を指定できるスタブ翻訳器で main() 全体と各段階の所要時間を計測する。
+
+使い方:
+  python scripts/bench_news.py                     # main() を3回計測
+  python scripts/bench_news.py --latency 0.3 --runs 5
+  python scripts/bench_news.py --skip-sleeps       # 配慮用の time.sleep を除外
+  python scripts/bench_news.py --scale 100,1000,5000   # 履歴・アーカイブ規模の拡大テスト
+  python scripts/bench_news.py --check             # 条件付きGET（304）・重複判定の回帰確認のみ
+"""
+import os, sys, re, json, time, shutil, tempfile, argparse, threading, types, statistics, hashlib
+import http.server
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+FIXTURES = os.path.join(HERE, 'bench_fixtures')
+
+# =====================================================================
+# ローカルHTTPサーバ（記録済みフィード・記事HTMLを配信）
+# =====================================================================
+
+class FixtureHandler(http.server.BaseHTTPRequestHandler):
+    """本物のサーバと同様に ETag / Last-Modified を返し、条件付きGETには 304 で応える"""
+    protocol_version = 'HTTP/1.1'
+    last_modified = 'Mon, 06 Jul 2026 00:00:00 GMT'
+    feed = b''
+    articles = []
+    requests_served = 0
+    bytes_served = 0
+    not_modified = 0
+
+    def do_GET(self):
+        if self.path.startswith('/feed'):
+            body, ctype = self.feed, 'application/rss+xml; charset=UTF-8'
+        else:
+            m = re.search(r'(\d+)', self.path)
+            n = int(m.group(1)) if m else 0
+            body, ctype = self.articles[n % len(self.articles)], 'text/html; charset=UTF-8'
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        type(self).requests_served += 1
+        if self.headers.get('If-None-Match') == etag or \
+                (not self.headers.get('If-None-Match') and self.headers.get('If-Modified-Since') == self.last_modified):
+            type(self).not_modified += 1
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        type(self).bytes_served += len(body)
+        self.send_response(200)
+        self.send_header('Content-Type', ctype)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', self.last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def start_fixture_server():
+    srv = http.server.ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+    base = f'http://127.0.0.1:{srv.server_port}'
+    FixtureHandler.feed = open(os.path.join(FIXTURES, 'dvb-feed.xml'), encoding='utf-8').read() \
+        .replace('{base}', base).encode('utf-8')
+    adir = os.path.join(FIXTURES, 'articles')
+    FixtureHandler.articles = [open(os.path.join(adir, f), 'rb').read() for f in sorted(os.listdir(adir))]
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, base
+
+# =====================================================================
+# スタブ翻訳器（generate_news.StubBackend に遅延と呼出回数の計測を加えたもの）
+# =====================================================================
+
+class StubTranslator:
+    calls = 0
+    chars = 0
+
+def install_stub_translator(g, latency):
+    """set_translation_backend() で試験用の翻訳エンジンに差し替える（Google翻訳には接続しない）"""
+    class BenchBackend(g.StubBackend):
+        name = 'bench'
+
+        def translate(self, text, source='en', target='ja'):
+            StubTranslator.calls += 1
+            StubTranslator.chars += len(text)
+            # generate_news 側の time は計測用に差し替えるため、遅延はこちらの time.sleep で待つ
+            time.sleep(latency)
+            return super().translate(text, source, target)
+
+    g.set_translation_backend(BenchBackend())
+
+# =====================================================================
+# 段階別タイマー
+# =====================================================================
+
+# (段階名, generate_news 内の関数名) ※ 入れ子になる段階は内側の時間も含む
+STAGES = [
+    ('feed', 'fetch_feed_bytes'),
+    ('feed', 'iter_feed_items'),
+    ('selection', 'is_used'),
+    ('selection', 'DedupIndex.load'),
+    ('detail', 'fetch_article_detail_ex'),
+    ('translation', 'translate_batch'),
+    ('kaisetsu', 'build_kaisetsu_from_content'),
+    ('render', 'build_article_record'),
+    ('render', 'render_issue_page'),
+    ('archive', 'update_archive'),
+]
+
+class StageTimer:
+    def __init__(self):
+        self.totals = {}
+        self.lock = threading.Lock()
+
+    def add(self, stage, dt):
+        with self.lock:
+            self.totals[stage] = self.totals.get(stage, 0.0) + dt
+
+    def wrap(self, stage, fn):
+        timer = self
+        def timed(*a, **kw):
+            t0 = time.perf_counter()
+            try:
+                return fn(*a, **kw)
+            finally:
+                timer.add(stage, time.perf_counter() - t0)
+        return timed
+
+    def wrap_gen(self, stage, fn):
+        # ジェネレータは消費に掛かった時間を計測する
+        timer = self
+        def timed(*a, **kw):
+            it = fn(*a, **kw)
+            while True:
+                t0 = time.perf_counter()
+                try:
+                    item = next(it)
+                except StopIteration:
+                    timer.add(stage, time.perf_counter() - t0)
+                    return
+                timer.add(stage, time.perf_counter() - t0)
+                yield item
+        return timed
+
+def instrument(g, timer):
+    """generate_news モジュールの各段階の関数を計時版に差し替え、元に戻す関数を返す"""
+    originals = []
+    for stage, name in STAGES:
+        owner, attr = (g, name) if '.' not in name else (getattr(g, name.split('.')[0]), name.split('.')[1])
+        fn = owner.__dict__[attr]
+        originals.append((owner, attr, fn))
+        if isinstance(fn, classmethod):
+            inner = fn.__func__
+            setattr(owner, attr, classmethod(timer.wrap(stage, inner)))
+        elif name == 'iter_feed_items':
+            setattr(owner, attr, timer.wrap_gen(stage, fn))
+        else:
+            setattr(owner, attr, timer.wrap(stage, fn))
+    def restore():
+        for owner, attr, fn in originals:
+            setattr(owner, attr, fn)
+    return restore
+
+# =====================================================================
+# 計測本体
+# =====================================================================
+
+def prepare_workdir(used_lines=None, issues=None):
+    """リポジトリの履歴ファイルを一時ディレクトリに複製する（規模テスト時は合成データで置換）"""
+    work = tempfile.mkdtemp(prefix='news-bench-')
+    for f in ['history.json', 'history.jsonl', 'issues.jsonl', 'archive.html']:
+        if os.path.exists(os.path.join(ROOT, f)):
+            shutil.copy(os.path.join(ROOT, f), work)
+    if used_lines is not None:
+        with open(os.path.join(work, 'history.json'), 'w', encoding='utf-8') as f:
+            json.dump({'fields': ['date', 'title', 'url', 'hash'],
+                       'records': [l.split('|', 1) + ['', ''] for l in used_lines]}, f, ensure_ascii=False)
+        open(os.path.join(work, 'history.jsonl'), 'w').close()
+    if issues is not None:
+        with open(os.path.join(work, 'issues.jsonl'), 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(e, ensure_ascii=False) + '\n' for e in issues)
+    return work
+
+def reset_module_state(g):
+    g.translation_cache.hits = g.translation_cache.misses = 0
+    g.extract_article_text.cache_clear()
+    g.analyze_article.cache_clear()
+    g._session = None
+    # 前の実行（と条件付きGETの確認）で減ったホストごとのレート枠を戻し、各回を同じ条件で計測する
+    g._http_remotes.clear()
+
+def run_main_once(g, skip_sleeps, warm_dir=None):
+    work = prepare_workdir()
+    if warm_dir:
+        shutil.copytree(os.path.join(warm_dir, '.cache'), os.path.join(work, '.cache'))
+    cwd = os.getcwd()
+    os.chdir(work)
+    reset_module_state(g)
+    timer = StageTimer()
+    restore = instrument(g, timer)
+    real_sleep = time.sleep
+    slept = [0.0]
+    def counting_sleep(sec):
+        slept[0] += sec
+        if not skip_sleeps:
+            real_sleep(sec)
+    # スタブ翻訳器の遅延は time.sleep を使うため、generate_news 側の sleep だけを差し替える
+    g.time = types.SimpleNamespace(**{k: getattr(time, k) for k in dir(time) if not k.startswith('_')})
+    g.time.sleep = counting_sleep
+    devnull = open(os.devnull, 'w')
+    stdout = sys.stdout
+    t0 = time.perf_counter()
+    try:
+        sys.stdout = devnull
+        g.main()
+    finally:
+        sys.stdout = stdout
+        total = time.perf_counter() - t0
+        g.time = time
+        restore()
+        os.chdir(cwd)
+    return total, timer.totals, slept[0], work
+
+def bench_main(args):
+    srv, base = start_fixture_server()
+    os.environ['NEWS_DVB_FEED'] = base + '/feed/'
+    sys.path.insert(0, HERE)
+    import generate_news as g
+    install_stub_translator(g, args.latency)
+    g.DVB_FEED = os.environ['NEWS_DVB_FEED']
+
+    check_conditional_get(g, base)
+    check_dedup_against_legacy(g)
+    if args.check:
+        srv.shutdown()
+        return
+    FixtureHandler.requests_served = FixtureHandler.bytes_served = FixtureHandler.not_modified = 0
+    print(f"=== main() ベンチマーク（翻訳遅延 {args.latency}s / {args.runs}回 / "
+          f"sleep{'除外' if args.skip_sleeps else '込み'}） ===")
+    totals, stages, last_work = [], {}, None
+    for i in range(args.runs):
+        StubTranslator.calls = 0
+        total, st, slept, work = run_main_once(g, args.skip_sleeps, warm_dir=last_work if args.warm else None)
+        if last_work and last_work != work:
+            shutil.rmtree(last_work, ignore_errors=True)
+        last_work = work
+        totals.append(total)
+        for k, v in st.items():
+            stages.setdefault(k, []).append(v)
+        print(f"  run {i+1}: {total:7.3f}s  翻訳呼出 {StubTranslator.calls}回  sleep合計 {slept:.1f}s")
+    if last_work:
+        shutil.rmtree(last_work, ignore_errors=True)
+    print(f"\n  合計    中央値 {statistics.median(totals):7.3f}s  最小 {min(totals):7.3f}s")
+    print("  段階別（中央値・入れ子の段階は内側を含む・並列部分はスレッド合計）:")
+    for stage in dict.fromkeys(s for s, _ in STAGES):
+        if stage in stages:
+            print(f"    {stage:<12} {statistics.median(stages[stage]) * 1000:9.1f} ms")
+        else:
+            # 計時対象の関数が main() から呼ばれなくなった場合に気付けるよう、黙って省かない
+            print(f"    {stage:<12}   未計測（{', '.join(n for s, n in STAGES if s == stage)} が呼ばれていない）")
+    print(f"  HTTP配信 {FixtureHandler.requests_served}件（うち304 {FixtureHandler.not_modified}件） / "
+          f"{FixtureHandler.bytes_served:,} bytes")
+    srv.shutdown()
+
+# =====================================================================
+# 条件付きGETの動作確認
+# =====================================================================
+
+def check_conditional_get(g, base):
+    """2回目のフィード取得が 304 になり、保存済みスナップショットと同じ内容を返すことを確かめる"""
+    snap = tempfile.mkdtemp(prefix='bench-feed-')
+    url = base + '/feed/'
+    devnull, stdout = open(os.devnull, 'w'), sys.stdout
+    try:
+        sys.stdout = devnull
+        before = FixtureHandler.not_modified
+        first = g.fetch_feed_bytes(url, snapshot_dir=snap)
+        after_first = FixtureHandler.not_modified
+        second = g.fetch_feed_bytes(url, snapshot_dir=snap)
+        after_second = FixtureHandler.not_modified
+    finally:
+        sys.stdout = stdout
+        devnull.close()
+        shutil.rmtree(snap, ignore_errors=True)
+    problems = []
+    if after_first != before:
+        problems.append('1回目の取得が 304 になった')
+    if after_second != after_first + 1:
+        problems.append('2回目の取得が 304 にならなかった（検証子が送られていない）')
+    if second != first or first != FixtureHandler.feed:
+        problems.append('304 のときにスナップショットと異なる内容が返った')
+    if problems:
+        raise SystemExit('条件付きGET確認: NG（' + ' / '.join(problems) + '）')
+    print('条件付きGET確認: OK（2回目は 304・スナップショットを使用）')
+
+# =====================================================================
+# 重複判定の回帰確認（旧 is_used の判定と比べる）
+# =====================================================================
+
+def legacy_is_used(title, used_list):
+    """DedupIndex 導入前の is_used（タイトルの6文字以上の単語が2つ以上、使用済み行に含まれるか）"""
+    tl = title.lower()
+    for used in used_list:
+        ul = used.lower()
+        words = [w for w in tl.split() if len(w) > 5]
+        if sum(1 for w in words if w in ul) >= 2:
+            return True
+    return False
+
+def check_dedup_against_legacy(g):
+    """
+    実際の使用済み履歴を古い順に流し、各タイトルをそれ以前の履歴と照合した判定を旧 is_used と比べる。
+    旧判定で重複とされたものを見逃したら NG（新しく重複と判定する分は件数だけ表示する）。
+    """
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        store = g.HistoryStore.load()
+    finally:
+        os.chdir(cwd)
+    lines, titles = store.lines(), store.titles()
+    idx = g.DedupIndex(min_word_len=g.DEDUP_MIN_WORD_LEN, min_shared=g.DEDUP_MIN_SHARED)
+    missed, extra = [], 0
+    for line, title in zip(lines, titles):
+        old, new = legacy_is_used(title, lines[:idx.count]), idx.seen(title)
+        if old and not new:
+            missed.append(title)
+        extra += new and not old
+        idx.add(line)
+    if missed:
+        raise SystemExit(f"重複判定確認: NG（旧判定より見逃し {len(missed)}件: {missed[0][:60]} ...）")
+    print(f"重複判定確認: OK（履歴{len(titles)}件で見逃し0件 / 旧判定に無い一致 {extra}件）")
+
+# =====================================================================
+# 規模拡大テスト（使用済み履歴 / issues.jsonl が数千件になった場合）
+# =====================================================================
+
+def synthetic_history(n):
+    words = ['junta', 'airstrike', 'refugees', 'township', 'resistance', 'election', 'border', 'monsoon',
+             'villagers', 'ceasefire', 'garment', 'workers', 'currency', 'sanctions', 'monastery', 'fighters',
+             'militia', 'hospital', 'teachers', 'students', 'farmers', 'harvest', 'pipeline', 'highway']
+    lines, issues = [], []
+    d0 = time.mktime((2026, 7, 7, 0, 0, 0, 0, 0, -1))
+    for i in range(n):
+        ds = time.strftime('%Y-%m-%d', time.localtime(d0 + i * 86400))
+        titles = []
+        for k in range(3):
+            t = ' '.join(words[(i * 7 + k * 5 + j * 3) % len(words)] for j in range(6)) + f' case{i}x{k}'
+            lines.append(f'{ds}|{t}')
+            titles.append(f'合成タイトル{i}-{k}：{t[:20]}')
+        issues.append({'vol': i + 1, 'date': ds, 'date_ja': ds, 'file': f'news-{ds}.html',
+                       'tags': [['tp', '内戦・軍事']] * 3, 'titles': titles})
+    return lines, issues
+
+def bench_scale(args):
+    sys.path.insert(0, HERE)
+    import generate_news as g
+    install_stub_translator(g, 0)
+    feed = open(os.path.join(FIXTURES, 'dvb-feed.xml'), encoding='utf-8').read().replace('{base}', 'http://x')
+    titles = [a['title'] for a in g.iter_feed_items(feed.encode('utf-8'))]
+    print("=== 規模拡大テスト ===")
+    print(f"  {'号数':>6} {'履歴行':>7} {'index構築':>10} {'index差分':>10} {'is_used×候補':>12} "
+          f"{'get_next_vol':>12} {'archive更新':>11}")
+    for n in [int(x) for x in args.scale.split(',')]:
+        lines, issues = synthetic_history(n)
+        work = prepare_workdir(lines, issues)
+        cwd = os.getcwd()
+        os.chdir(work)
+        stdout = sys.stdout
+        try:
+            t = time.perf_counter(); idx = g.DedupIndex.load(); t_build = time.perf_counter() - t
+            idx.save()
+            with open('history.jsonl', 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'date': '2099-01-01', 'title': 'appended headline about elephants',
+                                    'url': '', 'hash': ''}) + '\n')
+            t = time.perf_counter(); idx = g.DedupIndex.load(); t_incr = time.perf_counter() - t
+            t = time.perf_counter()
+            for title in titles:
+                g.is_used(title, idx)
+            t_used = time.perf_counter() - t
+            t = time.perf_counter(); g.get_next_vol(); t_vol = time.perf_counter() - t
+            sys.stdout = open(os.devnull, 'w')
+            arts = [{'title': x, 'content': ''} for x in titles[:3]]
+            t = time.perf_counter()
+            g.update_archive('2099-01-02', '2099年1月2日', f'Vol.{n+1:03d}', arts, titles[:3])
+            t_arch = time.perf_counter() - t
+        finally:
+            sys.stdout = stdout
+            os.chdir(cwd)
+            shutil.rmtree(work, ignore_errors=True)
+        print(f"  {n:>6} {len(lines):>7} {t_build*1000:>8.1f}ms {t_incr*1000:>8.1f}ms {t_used*1000:>10.2f}ms "
+              f"{t_vol*1000:>10.2f}ms {t_arch*1000:>9.1f}ms")
+
+def main():
+    ap = argparse.ArgumentParser(description='generate_news.py のオフラインベンチマーク')
+    ap.add_argument('--runs', type=int, default=3, help='main() の計測回数')
+    ap.add_argument('--latency', type=float, default=0.2, help='スタブ翻訳器の1回あたりの遅延（秒）')
+    ap.add_argument('--skip-sleeps', action='store_true', help='generate_news 内の time.sleep を待たずに計測')
+    ap.add_argument('--warm', action='store_true', help='前回の実行のキャッシュを引き継いで計測')
+    ap.add_argument('--check', action='store_true', help='条件付きGET（304）と重複判定の回帰確認だけを行う')
+    ap.add_argument('--scale', default='', help='規模拡大テストの号数（カンマ区切り、例: 100,1000,5000）')
+    args = ap.parse_args()
+    if args.scale:
+        bench_scale(args)
+    else:
+        bench_main(args)
+
+if __name__ == '__main__':
+    main()
@@ -5,16 +5,751 @@
 品質基準: 各記事固有の事実を盛り込んだ完全日本語解説
 怠慢禁止: 汎用テンプレートの使い回し禁止
 """
-import os, re, datetime, requests, shutil, time
+import os, re, datetime, requests, time, json, hashlib, gzip, math
 from bs4 import BeautifulSoup
 import xml.etree.ElementTree as ET
+import io, itertools, threading, cProfile, pstats, unicodedata, random, bisect
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from urllib.parse import urlsplit
+from html import unescape
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 WEEKDAYS_JA = ['月','火','水','木','金','土','日']
-DVB_FEED = "https://english.dvb.no/feed/"
+DVB_FEED = os.environ.get('NEWS_DVB_FEED', "https://english.dvb.no/feed/")
 TOKEN = os.environ.get('GH_TOKEN', '')
 
+ARCHIVE_CSS = """*{margin:0;padding:0;box-sizing:border-box;}body{font-family:'Noto Sans JP',sans-serif;background:#f2f5fa;color:#1a1a1a;line-height:1.8;}a{text-decoration:none;color:inherit;}.header{background:#0D2B5E;padding:14px 0;}.header-inner{max-width:900px;margin:0 auto;padding:0 24px;display:flex;align-items:center;justify-content:space-between;flex-wrap:wrap;gap:8px;}.logo{color:#fff;font-size:18px;font-weight:900;letter-spacing:1.5px;}.header-right{color:rgba(255,255,255,0.45);font-size:12px;}.hero{background:linear-gradient(160deg,#0D2B5E,#163d80);padding:48px 0 40px;}.hero-inner{max-width:900px;margin:0 auto;padding:0 24px;}.hero-label{font-size:11px;font-weight:700;color:#C9A84C;letter-spacing:3px;text-transform:uppercase;margin-bottom:14px;}.hero h1{color:#fff;font-size:26px;font-weight:900;line-height:1.5;margin-bottom:8px;}.hero-sub{color:rgba(255,255,255,0.6);font-size:13px;}.nav-bar{background:#fff;border-bottom:1px solid #e8edf5;position:sticky;top:0;z-index:100;}.nav-inner{max-width:900px;margin:0 auto;padding:0 24px;display:flex;gap:4px;overflow-x:auto;}.nav-inner a{padding:12px 16px;font-size:13px;font-weight:700;color:#666;white-space:nowrap;border-bottom:3px solid transparent;transition:all .2s;}.nav-inner a:hover,.nav-inner a.active{color:#0D2B5E;border-bottom-color:#C9A84C;}.wrap{max-width:900px;margin:0 auto;padding:44px 24px 80px;}.section-head{display:flex;align-items:center;gap:12px;margin-bottom:28px;padding-bottom:14px;border-bottom:2px solid #e0e8f5;}.section-head h2{font-size:15px;font-weight:900;color:#0D2B5E;}.count-badge{background:#C9A84C;color:#fff;font-size:11px;font-weight:700;padding:3px 10px;border-radius:20px;}.grid{display:grid;grid-template-columns:repeat(auto-fill,minmax(280px,1fr));gap:20px;margin-bottom:56px;}.card{background:#fff;border-radius:14px;box-shadow:0 3px 16px rgba(0,0,0,0.07);overflow:hidden;transition:transform .2s,box-shadow .2s;display:flex;flex-direction:column;}.card:hover{transform:translateY(-3px);box-shadow:0 8px 28px rgba(0,0,0,0.12);}.card-top{background:linear-gradient(135deg,#0D2B5E,#1a4a8a);padding:18px 20px 14px;}.card-vol{font-size:10px;font-weight:700;color:#C9A84C;letter-spacing:2px;text-transform:uppercase;margin-bottom:6px;}.card-date{font-size:12px;color:rgba(255,255,255,0.7);}.card-body{padding:18px 20px;flex:1;display:flex;flex-direction:column;}.card-tags{display:flex;flex-wrap:wrap;gap:5px;margin-bottom:12px;}.card-tag{font-size:10px;font-weight:700;padding:3px 9px;border-radius:12px;background:#eef2f8;color:#1a3a6b;border:1px solid #d0dcee;}.card-titles{list-style:none;flex:1;}.card-titles li{font-size:13px;color:#333;line-height:1.6;padding:5px 0 5px 14px;border-bottom:1px solid #f5f5f5;position:relative;}.card-titles li:last-child{border-bottom:none;}.card-titles li::before{content:'▸';color:#C9A84C;position:absolute;left:0;top:5px;font-size:11px;}.card-footer{padding:12px 20px;border-top:1px solid #f0f0f0;}.card-link{display:inline-flex;align-items:center;gap:5px;font-size:12px;font-weight:700;color:#0D2B5E;}.card-link:hover{color:#C9A84C;}.latest-banner{background:linear-gradient(135deg,#C9A84C,#e8c070);border-radius:14px;padding:22px 28px;margin-bottom:44px;display:flex;align-items:center;justify-content:space-between;gap:16px;flex-wrap:wrap;}.latest-banner .lb-label{font-size:11px;font-weight:700;letter-spacing:2px;color:rgba(0,0,0,0.5);text-transform:uppercase;margin-bottom:4px;}.latest-banner .lb-title{font-size:17px;font-weight:900;color:#0D2B5E;}.latest-banner .lb-sub{font-size:12px;color:rgba(0,0,0,0.5);margin-top:4px;}.latest-banner .lb-btn{background:#0D2B5E;color:#fff;padding:10px 22px;border-radius:8px;font-size:13px;font-weight:700;white-space:nowrap;}.latest-banner .lb-btn:hover{background:#163d80;}.search-box{display:flex;gap:8px;margin-bottom:20px;}.search-box input{flex:1;padding:10px 14px;border:1px solid #d0dcee;border-radius:8px;font-size:14px;font-family:inherit;}.search-box button{background:#0D2B5E;color:#fff;border:none;padding:10px 22px;border-radius:8px;font-size:13px;font-weight:700;font-family:inherit;cursor:pointer;}.search-results{list-style:none;margin-bottom:44px;}.search-results li{background:#fff;border-radius:10px;padding:12px 18px;margin-bottom:8px;box-shadow:0 2px 8px rgba(0,0,0,0.05);font-size:14px;}.search-results li a{font-weight:700;color:#0D2B5E;}.search-results li span{display:block;font-size:11px;color:#999;}.footer{background:#0a1f42;padding:28px 24px;text-align:center;}.footer p{font-size:12px;color:rgba(255,255,255,0.4);}@media(max-width:600px){.hero h1{font-size:21px;}.grid{grid-template-columns:1fr;}.latest-banner{flex-direction:column;}}"""
+
+# 号マニフェスト（バックナンバーの正データ。1行1号のJSON Lines）
+MANIFEST = 'issues.jsonl'
+
+# 月別バックナンバー: archive-YYYY-MM.html と遅延読込用の archive/YYYY-MM.json
+ARCHIVE_DATA_DIR = 'archive'
+ARCHIVE_LATEST_CARDS = 9
+
+# 記事検索インデックス: search/ 以下に語の先頭文字で分割したポスティングと記事一覧を置く
+SEARCH_DIR = 'search'
+SEARCH_SHARDS = 64
+SEARCH_DOC_BLOCK = 256
+SEARCH_INDEX_VERSION = 2
+
+# キャッシュ設定（NEWS_NO_CACHE=1 で全キャッシュを無効化）
+CACHE_DIR = os.environ.get('NEWS_CACHE_DIR', '.cache')
+CACHE_DISABLED = os.environ.get('NEWS_NO_CACHE', '') == '1'
+TRANSLATION_CACHE_MAX_ENTRIES = int(os.environ.get('NEWS_TRANSLATION_CACHE_MAX', '5000'))
+TRANSLATION_CACHE_MAX_AGE_DAYS = int(os.environ.get('NEWS_TRANSLATION_CACHE_DAYS', '90'))
+
+# 使用済み記事の履歴: 追記専用ログ history.jsonl と、定期的に圧縮した history.json（日付・タイトル順）。
+# ログがHISTORY_COMPACT_EVERY件たまったらスナップショットに畳み込む。used-news.txt は初回の移行元
+HISTORY_LOG = 'history.jsonl'
+HISTORY_SNAPSHOT = 'history.json'
+HISTORY_LEGACY = 'used-news.txt'
+HISTORY_COMPACT_EVERY = int(os.environ.get('NEWS_HISTORY_COMPACT_EVERY', '60'))
+
+# 重複判定: 長さDEDUP_MIN_WORD_LEN以上の単語がDEDUP_MIN_SHARED語以上一致したら使用済み
+DEDUP_MIN_WORD_LEN = int(os.environ.get('NEWS_DEDUP_MIN_WORD_LEN', '6'))
+DEDUP_MIN_SHARED = int(os.environ.get('NEWS_DEDUP_MIN_SHARED', '2'))
+
+# 並列実行数（NEWS_WORKERS=1 で従来どおり逐次処理）
+MAX_WORKERS = max(1, int(os.environ.get('NEWS_WORKERS', '3')))
+
+# HTTP設定（リトライ回数・バックオフ係数・記事HTMLキャッシュの有効時間）
+HTTP_TIMEOUT = 15
+HTTP_RETRIES = int(os.environ.get('NEWS_HTTP_RETRIES', '3'))
+HTTP_BACKOFF = float(os.environ.get('NEWS_HTTP_BACKOFF', '0.5'))
+ARTICLE_CACHE_TTL_HOURS = float(os.environ.get('NEWS_ARTICLE_CACHE_TTL_HOURS', '168'))
+
+# 流量制御: リモートごとの送信レート（回/秒）と連続送信できる回数、失敗時の指数バックオフ、
+# 連続失敗で以降の呼び出しを止めるサーキットブレーカーの閾値
+TRANSLATE_RATE = float(os.environ.get('NEWS_TRANSLATE_RATE', '1.25'))
+TRANSLATE_BURST = int(os.environ.get('NEWS_TRANSLATE_BURST', '2'))
+HTTP_RATE = float(os.environ.get('NEWS_HTTP_RATE', '1.0'))
+HTTP_BURST = int(os.environ.get('NEWS_HTTP_BURST', '2'))
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 30.0
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get('NEWS_CIRCUIT_FAILURES', '5'))
+
+# 翻訳バックエンド（google / stub）
+TRANSLATOR_BACKEND = os.environ.get('NEWS_TRANSLATOR', 'google')
+
+# 共有スタイルシート（assets/<名前>.<ハッシュ>.css）と事前圧縮（.gz / .br）
+ASSET_DIR = 'assets'
+PRECOMPRESS = os.environ.get('NEWS_PRECOMPRESS', '1') == '1'
+
+# 実行レポート（reports/news-YYYY-MM-DD.json）。NEWS_PROFILE=1 で cProfile も保存
+REPORT_DIR = os.environ.get('NEWS_REPORT_DIR', 'reports')
+PROFILE = os.environ.get('NEWS_PROFILE', '') == '1'
+
+# 実行時間の予算（ワークフローの timeout-minutes: 15 からセットアップと git push の時間を引いた値）。
+# 締切が近づいたら解説の翻訳を諦め、タイトル・本文を優先して必ず号を出す
+RUN_BUDGET_SECONDS = float(os.environ.get('NEWS_TIME_BUDGET', '600'))
+PUBLISH_RESERVE_SECONDS = 45   # 書き出し・バックナンバー更新用に常に残す時間
+DETAIL_BUDGET_SHARE = 0.3      # 詳細取得に使える残り時間の割合
+KAISETSU_BUDGET_SHARE = 0.6    # 解説（任意）の翻訳に使える残り時間の割合。残りは必須分の再試行用
+KAISETSU_MIN_SECONDS = 20      # 解説を翻訳するのに必要な1記事あたりの最低残り時間
+
 CSS = """*{margin:0;padding:0;box-sizing:border-box;}body{font-family:'Noto Sans JP',sans-serif;background:#f2f5fa;color:#1a1a1a;line-height:1.8;}a{text-decoration:none;color:inherit;}.header{background:#0D2B5E;padding:14px 0;}.header-inner{max-width:860px;margin:0 auto;padding:0 24px;display:flex;align-items:center;justify-content:space-between;flex-wrap:wrap;gap:8px;}.logo{color:#fff;font-size:18px;font-weight:900;letter-spacing:1.5px;}.header-right{color:rgba(255,255,255,0.45);font-size:12px;}.hero{background:linear-gradient(160deg,#0D2B5E,#163d80);padding:52px 0 44px;}.hero-inner{max-width:860px;margin:0 auto;padding:0 24px;}.vol{font-size:11px;font-weight:700;color:#C9A84C;letter-spacing:3px;text-transform:uppercase;margin-bottom:14px;}.hero h1{color:#fff;font-size:27px;font-weight:900;line-height:1.5;margin-bottom:10px;}.wrap{max-width:860px;margin:0 auto;padding:44px 24px 64px;}.editor-note{background:#fff;border-left:4px solid #C9A84C;padding:22px 26px;border-radius:0 10px 10px 0;margin-bottom:44px;box-shadow:0 2px 10px rgba(0,0,0,0.05);}.en-label{font-size:10px;font-weight:700;letter-spacing:2px;color:#C9A84C;text-transform:uppercase;margin-bottom:8px;}.editor-note p{font-size:14px;color:#444;line-height:1.95;}.article{background:#fff;border-radius:14px;box-shadow:0 3px 18px rgba(0,0,0,0.07);margin-bottom:36px;overflow:hidden;}.art-head{padding:30px 32px 0;}.art-meta{display:flex;flex-wrap:wrap;gap:8px;align-items:center;margin-bottom:14px;}.tag{font-size:11px;font-weight:700;padding:4px 12px;border-radius:20px;}.tp{background:#1a3a6b;color:#fff;}.ts{background:#1b4332;color:#fff;}.ti{background:#5c3317;color:#fff;}.tc{background:#4a1942;color:#fff;}.tsrc{background:#eef2f8;color:#0D2B5E;border:1px solid #c5d4ea;}.art-date{font-size:12px;color:#bbb;margin-left:auto;}.art-title{font-size:22px;font-weight:900;line-height:1.45;color:#0D2B5E;margin-bottom:8px;}.art-src{font-size:12px;color:#bbb;padding-bottom:20px;border-bottom:1px solid #f0f0f0;}.art-body{padding:26px 32px 8px;}.art-news{font-size:15px;color:#333;line-height:1.95;margin-bottom:28px;word-break:break-word;overflow-wrap:break-word;}.kaisetsu{background:#f7f9ff;border:1px solid #d4e0f5;border-radius:10px;padding:22px 24px;margin-bottom:20px;}.k-label{font-size:10px;font-weight:700;letter-spacing:2px;color:#1a3a6b;text-transform:uppercase;margin-bottom:14px;display:flex;align-items:center;gap:6px;}.k-label span{background:#1a3a6b;color:#fff;padding:2px 8px;border-radius:4px;font-size:10px;}.k-point{margin-bottom:18px;}.k-point:last-child{margin-bottom:0;}.k-point-title{font-size:14px;font-weight:700;color:#0D2B5E;margin-bottom:6px;display:flex;align-items:flex-start;gap:6px;}.k-point-title::before{content:'▶';color:#C9A84C;flex-shrink:0;}.k-point p{font-size:14px;color:#444;line-height:1.85;padding-left:14px;}.art-link{display:inline-flex;align-items:center;gap:6px;font-size:13px;font-weight:700;color:#0D2B5E;padding:12px 0 26px 32px;}.art-link:hover{color:#C9A84C;}.footer{background:#0a1f42;padding:28px 24px;text-align:center;}.footer p{font-size:12px;color:rgba(255,255,255,0.4);}@media(max-width:600px){.hero h1{font-size:21px;}.art-title{font-size:18px;}.art-head,.art-body,.art-link{padding-left:20px;padding-right:20px;}}.nav-bar{background:#132d5e;border-bottom:3px solid #C9A84C;position:sticky;top:0;z-index:999;}.nav-inner{max-width:900px;margin:0 auto;padding:0 20px;display:flex;align-items:center;gap:8px;height:46px;}.nav-btn{display:inline-flex;align-items:center;gap:5px;padding:7px 16px;border-radius:6px;font-size:13px;font-weight:700;text-decoration:none;transition:all .2s;white-space:nowrap;}.nav-btn-latest{background:#C9A84C;color:#0D2B5E;}.nav-btn-archive{background:rgba(255,255,255,0.12);color:#fff;border:1px solid rgba(255,255,255,0.25);}.nav-btn.active-page{opacity:0.55;pointer-events:none;cursor:default;}"""
 
+# =====================================================================
+# 出力ファイルの書き出し（一時ファイル→rename、複数ファイルの一括確定）
+# =====================================================================
+
+# 確定処理（rename）の途中で止まった場合に、次回起動時にやり直すための一覧
+PENDING_COMMIT = os.path.join(CACHE_DIR, 'pending-commit.json')
+
+_txn = None            # 確定待ちのファイル（パス→一時ファイル）
+_txn_appends = None    # 確定時に追記する内容（[パス, テキスト]）
+_txn_lock = threading.Lock()
+
+def atomic_write(path, data):
+    """一時ファイルに書いてから rename する（読み手が書きかけのファイルを見ることがない）"""
+    tmp = _write_tmp(path, data)
+    os.replace(tmp, path)
+
+def _write_tmp(path, data):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data.encode('utf-8') if isinstance(data, str) else data)
+    return tmp
+
+def write_file(path, data):
+    """出力ファイルを書き出す。output_transaction() の中では一時ファイルに書き、確定は commit まで待つ"""
+    with _txn_lock:
+        if _txn is not None:
+            _txn[path] = _write_tmp(path, data)
+            return
+    atomic_write(path, data)
+
+def read_current(path):
+    """確定待ちの内容があればそれを、無ければディスク上の内容を返す"""
+    with _txn_lock:
+        pending = _txn.get(path) if _txn is not None else None
+    try:
+        with open(pending or path, 'rb') as f:
+            return f.read()
+    except OSError:
+        return b''
+
+def append_file(path, text):
+    """ファイル末尾に追記する。output_transaction() の中では追記後の内容を確定待ちにする"""
+    if _txn is None:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(text)
+        return
+    write_file(path, read_current(path) + text.encode('utf-8'))
+
+def _append_synced(path, text):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a', encoding='utf-8', newline='\n') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+
+def append_durable(path, text):
+    """
+    追記専用ログへの追記（ファイルを読み直さない O(1) の追記と fsync）。
+    output_transaction() の中では rename と同じ確定処理の中で追記する。
+    """
+    with _txn_lock:
+        if _txn_appends is not None:
+            _txn_appends.append([path, text])
+            return
+    _append_synced(path, text)
+
+@contextmanager
+def output_transaction():
+    """
+    ブロック内の write_file / append_file / append_durable を溜め、正常終了時にまとめて確定する。
+    例外で抜けた場合は一時ファイルを捨て、既存の公開ファイルには一切触れない。
+    """
+    global _txn, _txn_appends
+    with _txn_lock:
+        _txn, _txn_appends = {}, []
+    try:
+        yield
+    except BaseException:
+        with _txn_lock:
+            pending, _txn, _txn_appends = _txn, None, None
+        for tmp in pending.values():
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+        raise
+    with _txn_lock:
+        pending, appends, _txn, _txn_appends = _txn, _txn_appends, None, None
+    _commit_pending(pending, appends)
+
+def _commit_pending(pending, appends=()):
+    if not pending and not appends:
+        return
+    # 確定内容を先に記録してから確定する（途中で止まっても recover_pending_commit で完了できる）
+    atomic_write(PENDING_COMMIT, json.dumps({'renames': pending, 'appends': list(appends)}, ensure_ascii=False))
+    for path, tmp in pending.items():
+        os.replace(tmp, path)
+    for path, text in appends:
+        _append_synced(path, text)
+    os.remove(PENDING_COMMIT)
+    print(f"出力確定: {len(pending)}ファイル / 追記 {len(appends)}件")
+
+def recover_pending_commit():
+    """前回の実行が確定処理の途中で止まっていたら、残りの rename と追記を完了させる"""
+    try:
+        with open(PENDING_COMMIT, 'r', encoding='utf-8') as f:
+            pending = json.load(f)
+    except (OSError, ValueError):
+        return 0
+    done = 0
+    for path, tmp in pending.get('renames', {}).items():
+        if os.path.exists(tmp):
+            os.replace(tmp, path)
+            done += 1
+    for path, text in pending.get('appends', []):
+        # 追記済みかどうかは末尾の一致で判定する（二重に追記しない）
+        if not read_current(path).endswith(text.encode('utf-8')):
+            _append_synced(path, text)
+            done += 1
+    os.remove(PENDING_COMMIT)
+    print(f"前回の未完了の出力確定を完了: {done}件")
+    return done
+
+# =====================================================================
+# 静的アセット（共有スタイルシート・事前圧縮ファイル）
+# =====================================================================
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+def minify_css(css):
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{}:;,>])\s*', r'\1', css)
+    return css.replace(';}', '}').strip()
+
+def write_precompressed(path, data=None):
+    """path の隣に gzip（.gz）と brotli（.br、モジュールがある場合のみ）の圧縮版を書き出す"""
+    if not PRECOMPRESS:
+        return
+    if data is None:
+        data = open(path, 'rb').read()
+    # mtime=0 で同じ内容なら同じバイト列にする（gitの差分を出さない）
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode='wb', compresslevel=9, mtime=0, filename='') as gz:
+        gz.write(data)
+    write_file(path + '.gz', buf.getvalue())
+    if brotli is not None:
+        write_file(path + '.br', brotli.compress(data, quality=11))
+
+def write_output(path, text):
+    """生成したHTML等を書き出し、事前圧縮版も更新する"""
+    data = text.encode('utf-8')
+    write_file(path, data)
+    write_precompressed(path, data)
+
+_stylesheets = {}
+
+def stylesheet(name, css):
+    """
+    CSSを最小化して内容ハッシュ付きのファイル名で書き出し、ページから参照するパスを返す。
+    内容が変わらない限り同じURLになるため、ブラウザに長期キャッシュさせられる。
+    """
+    if name in _stylesheets:
+        return _stylesheets[name]
+    data = minify_css(css).encode('utf-8')
+    href = f"{ASSET_DIR}/{name}.{hashlib.sha256(data).hexdigest()[:10]}.css"
+    if not os.path.exists(href):
+        write_file(href, data)
+        write_precompressed(href, data)
+    _stylesheets[name] = href
+    return href
+
+def prune_stale_assets():
+    """どのページからも参照されなくなった内容ハッシュ付きCSS（と圧縮版）を削除する"""
+    if not os.path.isdir(ASSET_DIR):
+        return 0
+    referenced = set(_stylesheets.values())
+    for name in os.listdir('.'):
+        if name.endswith('.html'):
+            with open(name, 'r', encoding='utf-8', errors='replace') as f:
+                referenced.update(re.findall(re.escape(ASSET_DIR) + r'/[\w.-]+?\.css', f.read()))
+    removed = 0
+    for name in os.listdir(ASSET_DIR):
+        css = re.sub(r'\.(gz|br)$', '', f"{ASSET_DIR}/{name}")
+        if css.endswith('.css') and css not in referenced:
+            os.remove(f"{ASSET_DIR}/{name}")
+            removed += 1
+    return removed
+
+# =====================================================================
+# 実行計測（段階タイマー・カウンタ・実行レポート）
+# =====================================================================
+
+class RunStats:
+    """1回の実行の段階別所要時間とカウンタを集計し、JSONレポートとして書き出す"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.stages = {}
+        self.sleeps = {}
+        self.counters = {}
+        self.meta = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - t0)
+
+    def add_time(self, name, sec):
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + sec
+
+    def add_sleep(self, reason, sec):
+        with self._lock:
+            self.sleeps[reason] = self.sleeps.get(reason, 0.0) + sec
+
+    def incr(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def report(self):
+        return {
+            'started_at': datetime.datetime.utcfromtimestamp(self.started).isoformat() + 'Z',
+            'wall_seconds': round(time.time() - self.started, 3),
+            **self.meta,
+            'stages': {k: round(v, 3) for k, v in self.stages.items()},
+            'sleep_seconds': {k: round(v, 3) for k, v in self.sleeps.items()},
+            'counters': dict(sorted(self.counters.items())),
+        }
+
+    def write(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=1)
+
+STATS = RunStats()
+
+class RunBudget:
+    """
+    実行全体の締切から各段階の締切を割り当てる。start() を呼ぶまで（--rebuild / --backfill）は無制限。
+    段階の締切は「その時点の残り時間 × 配分」で決め、書き出し用の予備時間は常に残す。
+    """
+
+    def __init__(self):
+        self.deadline = None
+
+    def start(self, total_seconds, reserve_seconds=PUBLISH_RESERVE_SECONDS):
+        self.deadline = time.time() + total_seconds - reserve_seconds
+
+    def remaining(self):
+        return float('inf') if self.deadline is None else self.deadline - time.time()
+
+    def stage_deadline(self, share=1.0):
+        """残り時間の share 割を使い切る時刻（無制限なら None）"""
+        if self.deadline is None:
+            return None
+        return time.time() + max(0.0, self.remaining()) * share
+
+    def optional_deadline(self, articles):
+        """解説翻訳（任意）の締切。1記事あたりの最低時間も残っていなければ即締切（=翻訳しない）"""
+        if self.deadline is None:
+            return None
+        if self.remaining() < KAISETSU_MIN_SECONDS * max(1, articles):
+            STATS.incr('budget.kaisetsu_skipped')
+            return time.time()
+        return self.stage_deadline(KAISETSU_BUDGET_SHARE)
+
+BUDGET = RunBudget()
+
+def expired(deadline):
+    return deadline is not None and time.time() >= deadline
+
+# =====================================================================
+# 流量制御（トークンバケット・指数バックオフ・サーキットブレーカー）
+# =====================================================================
+
+class TokenBucket:
+    """送信レートの上限。トークンが残っていれば待たずに通し、足りない分だけ待たせる"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """トークンを1つ予約し、送信までに待つべき秒数を返す"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+class Remote:
+    """
+    リモート1つ分の流量制御。送信前に acquire() でレートを守り、結果を success() / failure() で報告する。
+    失敗が続くとジッター付きの指数バックオフで待ち、CIRCUIT_FAILURE_THRESHOLD 回連続したら
+    回路を開いて、この実行の残りでは呼び出さない（呼び出し側はフォールバックに切り替える）。
+    """
+
+    def __init__(self, name, rate, burst, threshold=CIRCUIT_FAILURE_THRESHOLD):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.threshold = threshold
+        self.failures = 0
+        self.open = False
+        self.lock = threading.Lock()
+
+    def available(self):
+        return not self.open
+
+    def acquire(self):
+        wait = self.bucket.reserve()
+        if wait > 0:
+            pause(wait, f'{self.name}.rate')
+
+    def success(self):
+        with self.lock:
+            self.failures = 0
+
+    def failure(self):
+        with self.lock:
+            self.failures += 1
+            failures = self.failures
+            if failures >= self.threshold and not self.open:
+                self.open = True
+                print(f"  {self.name}: {failures}回連続で失敗。以降の呼び出しを停止。")
+                STATS.incr(f'{self.name}.circuit_open')
+        STATS.incr(f'{self.name}.failures')
+        if not self.open:
+            self.backoff(failures)
+
+    def backoff(self, n):
+        """
+        n 回目の再試行前に待つ。failure() から呼ばれるほか、相手は正常だが結果が使えなかった場合
+        （翻訳結果が日本語でない等）にも呼び出し側が直接使う。こちらは回路の失敗回数に数えない。
+        """
+        # フルジッター: 0〜(基準×2^(n-1)) の一様乱数だけ待ち、並列の再試行が揃わないようにする
+        pause(random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (n - 1))),
+              f'{self.name}.backoff')
+
+TRANSLATOR = Remote('translate', TRANSLATE_RATE, TRANSLATE_BURST)
+_http_remotes = {}
+_http_remotes_lock = threading.Lock()
+
+def http_remote(url):
+    """URLのホストごとの Remote（dvb.no など）"""
+    host = urlsplit(url).netloc
+    with _http_remotes_lock:
+        if host not in _http_remotes:
+            _http_remotes[host] = Remote(f'http.{host}', HTTP_RATE, HTTP_BURST)
+        return _http_remotes[host]
+
+def pause(seconds, reason):
+    """time.sleep の代わり。理由ごとの待ち時間をレポートに記録する"""
+    STATS.incr(f'sleep.{reason}.count')
+    STATS.add_sleep(reason, seconds)
+    time.sleep(seconds)
+
+# =====================================================================
+# キーワード・固有表現テーブル（分類・地名・組織・解説トピック・固有名詞変換で共用）
+# =====================================================================
+
+CATEGORY_RULES = [
+    ('tp', '内戦・軍事', ['military', 'airstrike', 'coup', 'junta', 'war', 'attack', 'bomb', 'killed', 'fighting', 'troops']),
+    ('ts', '経済・貿易', ['economy', 'trade', 'investment', 'business', 'dam', 'infrastructure', 'border', 'price', 'currency']),
+    ('ti', '人道・難民', ['refugee', 'civilian', 'humanitarian', 'rohingya', 'displaced', 'human rights', 'missing', 'women', 'children']),
+]
+DEFAULT_CATEGORY = ('tc', '文化・社会')
+
+MYANMAR_PLACES = ['Rakhine', 'Sagaing', 'Ayeyarwady', 'Kachin', 'Shan', 'Karen', 'Kayin',
+                  'Mandalay', 'Naypyidaw', 'Yangon', 'Bago', 'Magway', 'Chin', 'Mon', 'Tanintharyi']
+
+ORG_KEYWORDS = {
+    'SCEF': '民主抵抗連合SCEF',
+    'NUG': '国民統一政府（NUG）',
+    'Arakan Army': 'アラカン軍（AA）',
+    'ICRC': '赤十字国際委員会（ICRC）',
+    'ASEAN': 'ASEAN',
+    'Fortify Rights': 'フォーティファイ・ライツ',
+    'KNU': 'カレン民族同盟（KNU）',
+    'KIO': 'カチン独立機構（KIO）',
+    'UNHCR': '国連難民高等弁務官事務所（UNHCR）',
+    'United Nations': '国連',
+    'UN Security Council': '国連安保理',
+}
+
+# 解説ポイントのタイトル（上から順に最初に一致したトピックを採用）
+KAISETSU_TOPICS = [
+    (['suu kyi', 'aung san'],
+     ("アウンサン・スーチー氏をめぐる最新動向と軍政の意図",
+      "ASEAN・国連の対応と日本政府の立場",
+      "在日ミャンマー人への影響とNL-DGの支援現場")),
+    (['scef', 'nug', 'resistance', 'r2p'],
+     ("SCEFと国際的正統性をめぐる最新の動き",
+      "国連・米国・欧州と日本の対応の差異",
+      "ミャンマー情勢の変化が日本のミャンマー人材事業に与える影響")),
+    (['airstrike', 'attack', 'bombing', 'killed', 'civilian'],
+     ("今回の攻撃・戦闘の具体的な状況と被害規模",
+      "人道支援機関・日本政府の緊急対応と課題",
+      "出身地域への攻撃が在日ミャンマー人労働者に与える精神的影響")),
+    (['china', 'russia', 'weapons', 'arms', 'military aid'],
+     ("中国・ロシアのミャンマー軍政への具体的な軍事支援の内容",
+      "国連安保理での拒否権行使と日本の外交的立場",
+      "軍政の長期化が日本のミャンマー人材調達に与えるリスク")),
+    (['rohingya', 'stateless', 'refugee'],
+     ("ロヒンギャ問題の最新状況と国際社会の認識",
+      "UNHCR・ASEAN・日本政府の難民対応",
+      "日本在住のミャンマー人・ロヒンギャへの支援の課題")),
+    (['flood', 'dam', 'disaster', 'typhoon', 'earthquake'],
+     ("自然災害と武力衝突が重なる複合的人道危機の実態",
+      "国際緊急支援と軍政による移動制限の矛盾",
+      "被災地出身の在日ミャンマー人への精神的サポートの必要性")),
+    (['election', 'vote', 'political', 'coup'],
+     ("今回の政治的動向が示すミャンマー軍政の戦略",
+      "民主主義回復に向けた国際社会の圧力と日本の対話路線",
+      "政治状況の変化が日本在住のミャンマー人コミュニティに与える影響")),
+    (['economy', 'trade', 'investment', 'sanction'],
+     ("経済制裁・貿易動向がミャンマー経済に与える具体的影響",
+      "日本企業のミャンマー事業継続と撤退判断の現状",
+      "在日ミャンマー人労働者の送金環境と生活への影響")),
+]
+
+# 英語固有名詞→日本語（大文字小文字を区別して置換）
+PROPER_NOUNS = [
+    ('Aung San Suu Kyi', 'アウンサン・スーチー氏'),
+    ('Min Aung Hlaing', 'ミン・アウン・フライン'),
+    ('Kyaw Moe Tun', 'チョー・モー・トゥン'),
+    ('Arakan Army', 'アラカン軍'),
+    ('National Unity Government', '国民統一政府（NUG）'),
+    ('Kachin Independence Organisation', 'カチン独立機構（KIO）'),
+    ('Karen National Union', 'カレン民族同盟（KNU）'),
+    ('Karenni National Progressive Party', 'カレンニー民族進歩党（KNPP）'),
+    ('Chin National Front', 'チン民族戦線（CNF）'),
+    ('Fortify Rights', 'フォーティファイ・ライツ'),
+    ('Rakhine', 'ラカイン'),
+    ('Sagaing', 'サガイン'),
+    ('Ayeyarwady', 'エーヤワディー'),
+    ('Mandalay', 'マンダレー'),
+    ('Naypyidaw', 'ネピドー'),
+    ('Yangon', 'ヤンゴン'),
+    ('Myanmar', 'ミャンマー'),
+]
+
+# 解説ポイント2・3の材料にする文の判定語
+INTL_WORDS = ['japan', 'asean', 'united nations', 'un ', 'international', 'sanctions', 'response',
+              'statement', 'urged', 'demanded', 'called for', 'condemned', 'support']
+IMPACT_WORDS = ['workers', 'civilians', 'people', 'residents', 'community', 'families', 'economy', 'business']
+
+def _alternation(words):
+    # 長い語を優先してマッチさせる
+    return '|'.join(re.escape(w) for w in sorted(set(words), key=len, reverse=True))
+
+class KeywordMatcher:
+    """
+    上記テーブルの全キーワードを1本の正規表現にまとめ、小文字化したテキストを1回走査して
+    分類・地名・組織・解説トピックをまとめて判定する（従来どおり部分文字列一致）。
+    """
+
+    def __init__(self):
+        words = set(INTL_WORDS) | set(IMPACT_WORDS)
+        for _, _, kws in CATEGORY_RULES:
+            words.update(kws)
+        words.update(p.lower() for p in MYANMAR_PLACES)
+        words.update(k.lower() for k in ORG_KEYWORDS)
+        for kws, _ in KAISETSU_TOPICS:
+            words.update(kws)
+        # 先読みで全位置を試すため、他の語の内部に現れる語も取りこぼさない
+        self.scan_re = re.compile('(?=(' + _alternation(words) + '))')
+        # 同じ位置で長い語に一致した場合、その接頭辞になっている語も一致扱いにする
+        self.prefixes = {w: [v for v in words if v != w and w.startswith(v)] for w in words}
+        self.noun_re = re.compile(_alternation(en for en, _ in PROPER_NOUNS))
+        self.noun_map = dict(PROPER_NOUNS)
+        self.intl_re = re.compile(_alternation(INTL_WORDS))
+        self.impact_re = re.compile(_alternation(IMPACT_WORDS))
+
+    def scan(self, text):
+        """text（小文字化済み）に含まれるキーワードの集合"""
+        found = set()
+        for m in self.scan_re.finditer(text):
+            w = m.group(1)
+            if w not in found:
+                found.add(w)
+                found.update(self.prefixes[w])
+        return found
+
+    def analyze(self, text):
+        found = self.scan(text.lower())
+        category = next(((tc, tl) for tc, tl, kws in CATEGORY_RULES if any(w in found for w in kws)),
+                        DEFAULT_CATEGORY)
+        topic = next((titles for kws, titles in KAISETSU_TOPICS if any(w in found for w in kws)), None)
+        return {
+            'category': category,
+            'places': [p for p in MYANMAR_PLACES if p.lower() in found],
+            'orgs': [v for k, v in ORG_KEYWORDS.items() if k.lower() in found],
+            'topic': topic,
+        }
+
+    def replace_nouns(self, text):
+        return self.noun_re.sub(lambda m: self.noun_map[m.group(0)], text)
+
+MATCHER = KeywordMatcher()
+
+@lru_cache(maxsize=64)
+def analyze_article(title, content):
+    """記事1本分の分類・地名・組織・解説トピック（記事ごとにメモ化）"""
+    return MATCHER.analyze(title + ' ' + content)
+
+# =====================================================================
+# 翻訳キャッシュ（原文ハッシュをキーにしたディスクキャッシュ）
+# =====================================================================
+
+class TranslationCache:
+    """正規化した原文と言語ペアのハッシュで翻訳結果を保存するディスクキャッシュ"""
+
+    def __init__(self, root, max_entries=5000, max_age_days=90, enabled=True):
+        self.root = root
+        self.max_entries = max_entries
+        self.max_age = max_age_days * 86400
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text, source='en', target='ja'):
+        norm = re.sub(r'\s+', ' ', text).strip()
+        return hashlib.sha256(f"{source}\x1f{target}\x1f{norm}".encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key + '.json')
+
+    def get(self, text, source='en', target='ja'):
+        if not self.enabled:
+            return None
+        path = self._path(self.key(text, source, target))
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age:
+                os.remove(path)
+                raise FileNotFoundError(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)['result']
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return result
+
+    def put(self, text, result, source='en', target='ja'):
+        if not self.enabled:
+            return
+        path = self._path(self.key(text, source, target))
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 並列の一括翻訳で同じ文（定型の補足文など）を同時に書くことがあるため、一時ファイルはスレッドごとに分ける
+            tmp = path + f'.{threading.get_ident()}.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'source': source, 'target': target, 'text': text, 'result': result},
+                          f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"  翻訳キャッシュ書込エラー: {e}")
+
+    def prune(self):
+        """期限切れエントリを削除し、上限件数を超えた古いものから削除する"""
+        if not self.enabled or not os.path.isdir(self.root):
+            return 0
+        now = time.time()
+        entries = []
+        removed = 0
+        for dirpath, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(dirpath, name)
+                try:
+                    mtime = os.path.getmtime(path)
+                    if now - mtime > self.max_age or name.endswith('.tmp'):
+                        os.remove(path)
+                        removed += 1
+                    else:
+                        entries.append((mtime, path))
+                except OSError:
+                    pass
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - self.max_entries)]:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def stats(self):
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        return f"hit={self.hits} miss={self.misses} ({rate:.0f}%)"
+
+translation_cache = TranslationCache(
+    os.path.join(CACHE_DIR, 'translations'),
+    max_entries=TRANSLATION_CACHE_MAX_ENTRIES,
+    max_age_days=TRANSLATION_CACHE_MAX_AGE_DAYS,
+    enabled=not CACHE_DISABLED,
+)
+
+# =====================================================================
+# 翻訳バックエンド（差し替え可能な翻訳エンジン）
+# =====================================================================
+
+class TranslationBackend:
+    """翻訳エンジンのインターフェース。translate() は訳文を返し、失敗時は例外を送出する"""
+    name = 'base'
+
+    def translate(self, text, source='en', target='ja'):
+        raise NotImplementedError
+
+class GoogleBackend(TranslationBackend):
+    """deep_translator 経由の Google 翻訳"""
+    name = 'google'
+
+    def translate(self, text, source='en', target='ja'):
+        from deep_translator import GoogleTranslator
+        return GoogleTranslator(source=source, target=target).translate(text)
+
+class StubBackend(TranslationBackend):
+    """ネットワークを使わない試験用。英単語を置き換えた擬似訳文を返す（一括翻訳の区切りは保つ）"""
+    name = 'stub'
+
+    def translate(self, text, source='en', target='ja'):
+        return re.sub(r'[A-Za-z]+', '訳語', text)
+
+TRANSLATION_BACKENDS = {cls.name: cls for cls in (GoogleBackend, StubBackend)}
+_translation_backend = None
+
+def get_translation_backend():
+    global _translation_backend
+    if _translation_backend is None:
+        _translation_backend = TRANSLATION_BACKENDS[TRANSLATOR_BACKEND]()
+    return _translation_backend
+
+def set_translation_backend(backend):
+    """翻訳エンジンを差し替える（TranslationBackend のインスタンス）"""
+    global _translation_backend
+    _translation_backend = backend
+
 # =====================================================================
 # 翻訳関数（品質検証付き）
 # =====================================================================
@@ -26,222 +761,778 @@ def is_japanese(text):
     ja_chars = sum(1 for c in text if '\u3040' <= c <= '\u9fff')
     return ja_chars > len(text) * 0.2
 
-def translate_robust(text, retries=3):
-    """翻訳失敗・英語返却を検知して再試行する堅牢な翻訳関数"""
+def translate_robust(text, retries=3, deadline=None):
+    """
+    翻訳失敗・英語返却を検知して再試行する堅牢な翻訳関数。
+    deadline（time.time() の値）を過ぎたら再試行せず固有名詞変換に切り替える。
+    """
     if not text or not text.strip():
         return text
     text = text.strip()[:3000]
 
+    # キャッシュヒット時は翻訳APIもsleepも不要
+    cached = translation_cache.get(text)
+    if cached is not None:
+        return cached
+
     for attempt in range(retries):
+        if expired(deadline):
+            print("  持ち時間切れ。固有名詞変換に切替。")
+            STATS.incr('translate.deadline_fallback')
+            break
+        if not TRANSLATOR.available():
+            STATS.incr('translate.circuit_fallback')
+            break
+        TRANSLATOR.acquire()
         try:
-            from deep_translator import GoogleTranslator
-            result = GoogleTranslator(source='en', target='ja').translate(text)
-            time.sleep(0.8)
+            STATS.incr('translate.requests')
+            STATS.incr('translate.chars', len(text))
+            result = get_translation_backend().translate(text)
             if result and is_japanese(result):
+                TRANSLATOR.success()
+                translation_cache.put(text, result)
                 return result
             else:
+                # 応答自体は正常なので回路の失敗には数えず、待ってから再試行するだけにする
                 print(f"  翻訳NG（日本語不足, 試行{attempt+1}/{retries}）: {str(result)[:40]}")
-                time.sleep(2)
+                STATS.incr('translate.not_japanese')
+                TRANSLATOR.success()
+                if attempt + 1 < retries:
+                    TRANSLATOR.backoff(attempt + 1)
         except Exception as e:
             print(f"  翻訳例外 試行{attempt+1}: {e}")
-            time.sleep(2)
+            STATS.incr('translate.errors')
+            TRANSLATOR.failure()
 
     # 全試行失敗 → 固有名詞変換のみ実施
-    print("  全翻訳試行失敗。固有名詞変換のみ実施。")
+    print("  翻訳できず。固有名詞変換のみ実施。")
+    STATS.incr('translate.fallback_proper_nouns')
     return apply_proper_nouns(text)
 
+# 一括翻訳の区切り（翻訳後に全角化されても分割できるよう正規表現で照合）
+BATCH_DELIM = '\n\n###\n\n'
+BATCH_SPLIT_RE = re.compile(r'\s*[#＃]\s*[#＃]\s*[#＃]\s*')
+BATCH_MAX_CHARS = 4500
+
+def _translate_joined(segments):
+    """区切り文字で連結したセグメント群を1リクエストで翻訳し、分割して返す（失敗時None）"""
+    if not TRANSLATOR.available():
+        return None
+    TRANSLATOR.acquire()
+    try:
+        joined = BATCH_DELIM.join(segments)
+        STATS.incr('translate.batch_requests')
+        STATS.incr('translate.chars', len(joined))
+        result = get_translation_backend().translate(joined)
+        TRANSLATOR.success()
+    except Exception as e:
+        print(f"  一括翻訳例外: {e}")
+        STATS.incr('translate.batch_errors')
+        TRANSLATOR.failure()
+        return None
+    parts = [p.strip() for p in BATCH_SPLIT_RE.split(result or '')]
+    if len(parts) != len(segments):
+        print(f"  一括翻訳の分割数不一致（{len(parts)}/{len(segments)}）。個別翻訳に切替。")
+        STATS.incr('translate.batch_split_mismatch')
+        return None
+    return parts
+
+def translate_batch(texts, deadlines=None):
+    """
+    複数セグメントをまとめて翻訳する。
+    キャッシュ済みのものを除き、BATCH_MAX_CHARS以内に詰めて1リクエストずつ送信。
+    日本語になっていないセグメントだけ translate_robust で個別に再試行する。
+    deadlines にセグメントごとの締切を渡すと、締切を過ぎたセグメントは翻訳せず固有名詞変換で返す。
+    """
+    deadlines = deadlines or [None] * len(texts)
+    results = list(texts)
+    pending = []
+    for i, t in enumerate(texts):
+        if not t or not t.strip():
+            continue
+        src = t.strip()[:3000]
+        cached = translation_cache.get(src)
+        if cached is not None:
+            results[i] = cached
+        elif expired(deadlines[i]):
+            STATS.incr('translate.deadline_fallback')
+            results[i] = apply_proper_nouns(src)
+        else:
+            pending.append((i, src))
+
+    chunks, cur, size = [], [], 0
+    for i, src in pending:
+        if cur and size + len(src) + len(BATCH_DELIM) > BATCH_MAX_CHARS:
+            chunks.append(cur)
+            cur, size = [], 0
+        cur.append((i, src))
+        size += len(src) + len(BATCH_DELIM)
+    if cur:
+        chunks.append(cur)
+
+    for chunk in chunks:
+        # 締切を過ぎたセグメントは送らない（前のチャンクの再試行で時間を使った場合）
+        live = []
+        for i, src in chunk:
+            if expired(deadlines[i]):
+                STATS.incr('translate.deadline_fallback')
+                results[i] = apply_proper_nouns(src)
+            else:
+                live.append((i, src))
+        parts = _translate_joined([src for _, src in live]) if len(live) > 1 else None
+        for n, (i, src) in enumerate(live):
+            part = parts[n] if parts else None
+            if part and is_japanese(part):
+                translation_cache.put(src, part)
+                results[i] = part
+            else:
+                STATS.incr('translate.batch_segment_retry')
+                results[i] = translate_robust(src, deadline=deadlines[i])
+    return results
+
 def apply_proper_nouns(text):
     """英語固有名詞を日本語に変換"""
-    replacements = [
-        ('Aung San Suu Kyi', 'アウンサン・スーチー氏'),
-        ('Min Aung Hlaing', 'ミン・アウン・フライン'),
-        ('Kyaw Moe Tun', 'チョー・モー・トゥン'),
-        ('Arakan Army', 'アラカン軍'),
-        ('National Unity Government', '国民統一政府（NUG）'),
-        ('Kachin Independence Organisation', 'カチン独立機構（KIO）'),
-        ('Karen National Union', 'カレン民族同盟（KNU）'),
-        ('Karenni National Progressive Party', 'カレンニー民族進歩党（KNPP）'),
-        ('Chin National Front', 'チン民族戦線（CNF）'),
-        ('Fortify Rights', 'フォーティファイ・ライツ'),
-        ('Rakhine', 'ラカイン'),
-        ('Sagaing', 'サガイン'),
-        ('Ayeyarwady', 'エーヤワディー'),
-        ('Mandalay', 'マンダレー'),
-        ('Naypyidaw', 'ネピドー'),
-        ('Yangon', 'ヤンゴン'),
-        ('Myanmar', 'ミャンマー'),
-    ]
-    for en, ja in replacements:
-        text = text.replace(en, ja)
-    return text
+    return MATCHER.replace_nouns(text)
+
+# =====================================================================
+# HTTPクライアント（接続プール・リトライ・記事HTMLのディスクキャッシュ）
+# =====================================================================
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """ホストごとに接続を再利用する共有Session（429/5xxはバックオフ付きで自動リトライ）"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(total=HTTP_RETRIES, backoff_factor=HTTP_BACKOFF,
+                          status_forcelist=[429, 500, 502, 503, 504], allowed_methods=['GET'])
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(4, MAX_WORKERS * 2), max_retries=retry)
+            _session = requests.Session()
+            _session.headers['User-Agent'] = 'Mozilla/5.0'
+            _session.mount('https://', adapter)
+            _session.mount('http://', adapter)
+        return _session
+
+def _http_cache_path(url):
+    return os.path.join(CACHE_DIR, 'http', hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json')
+
+def _load_http_cache(url):
+    if CACHE_DISABLED:
+        return None
+    try:
+        with open(_http_cache_path(url), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _save_http_cache(url, entry):
+    if CACHE_DISABLED:
+        return
+    path = _http_cache_path(url)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + f'.{threading.get_ident()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"  HTTPキャッシュ書込エラー: {e}")
+
+def cached_get(url, ttl_hours=ARTICLE_CACHE_TTL_HOURS):
+    """
+    URLの本文をキャッシュ経由で取得し (本文, ネットワークを使ったか) を返す。
+    有効期限内ならローカルから返し、期限切れなら ETag / Last-Modified で再検証する。
+    """
+    entry = _load_http_cache(url)
+    if entry and time.time() - entry.get('fetched_at', 0) < ttl_hours * 3600:
+        STATS.incr('http.cache_hits')
+        return entry['body'], False
+    headers = {}
+    if entry and entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry and entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+    remote = http_remote(url)
+    if not remote.available():
+        raise requests.ConnectionError(f"{remote.name}: 連続失敗のため取得を停止中")
+    remote.acquire()
+    try:
+        r = get_session().get(url, timeout=HTTP_TIMEOUT, headers=headers)
+    except Exception:
+        remote.failure()
+        raise
+    STATS.incr('http.requests')
+    STATS.incr('http.bytes', len(r.content))
+    # 404 などは記事側の問題なので、相手サーバの不調（429・5xx）だけを失敗として数える
+    if r.status_code == 429 or r.status_code >= 500:
+        remote.failure()
+    else:
+        remote.success()
+    if r.status_code == 304 and entry:
+        STATS.incr('http.not_modified')
+        entry['fetched_at'] = time.time()
+        _save_http_cache(url, entry)
+        return entry['body'], True
+    r.raise_for_status()
+    _save_http_cache(url, {
+        'url': url, 'etag': r.headers.get('ETag'), 'last_modified': r.headers.get('Last-Modified'),
+        'fetched_at': time.time(), 'body': r.text,
+    })
+    return r.text, True
+
+def prune_http_cache(max_age_days=30):
+    """最終取得から max_age_days 日を過ぎたHTTPキャッシュを削除する"""
+    root = os.path.join(CACHE_DIR, 'http')
+    if CACHE_DISABLED or not os.path.isdir(root):
+        return 0
+    removed = 0
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        try:
+            if time.time() - os.path.getmtime(path) > max_age_days * 86400:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
 
 # =====================================================================
 # 記事取得関数
 # =====================================================================
 
-def get_date_info():
-    n = datetime.datetime.utcnow() + datetime.timedelta(hours=9)
+def get_date_info(n=None):
+    """日本時間の日付（YYYY-MM-DD, 和文表記）。n を渡すとその日付で作る"""
+    n = n or datetime.datetime.utcnow() + datetime.timedelta(hours=9)
     ds = n.strftime('%Y-%m-%d')
     dj = f"{n.year}年{n.month}月{n.day}日（{WEEKDAYS_JA[n.weekday()]}）"
     return ds, dj
 
 def get_next_vol():
-    try:
-        c = open('archive.html', 'r', encoding='utf-8').read()
-        nums = [int(x) for x in re.findall(r"card-vol'>Vol\.0*(\d+)<", c)]
-        return max(nums) + 1 if nums else 14
-    except:
-        return 14
+    """マニフェスト末尾の号数+1（マニフェストが無ければ archive.html から移行して生成）"""
+    ensure_manifest()
+    last = last_manifest_entry()
+    return last['vol'] + 1 if last else 14
+
+CONTENT_NS = '{http://purl.org/rss/1.0/modules/content/}encoded'
+
+def fetch_feed_bytes(url=DVB_FEED, snapshot_dir=None):
+    """
+    ETag / Last-Modified による条件付きGETでフィードを取得する。
+    304（未更新）や通信エラー時は前回保存したスナップショットを返す。
+    """
+    snapshot_dir = snapshot_dir or os.path.join(CACHE_DIR, 'feed')
+    name = hashlib.sha256(url.encode('utf-8')).hexdigest()[:16]
+    body_path = os.path.join(snapshot_dir, name + '.xml')
+    meta_path = os.path.join(snapshot_dir, name + '.json')
+    meta = {}
+    if not CACHE_DISABLED and os.path.exists(body_path):
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = {}
+
+    def snapshot():
+        with open(body_path, 'rb') as f:
+            return f.read()
 
-def load_used():
+    headers = {}
+    if meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    if meta.get('last_modified'):
+        headers['If-Modified-Since'] = meta['last_modified']
+    remote = http_remote(url)
     try:
-        return [l.strip() for l in open('used-news.txt', 'r', encoding='utf-8').read().split('\n')
-                if l.strip() and not l.startswith('#')]
-    except:
-        return []
+        if not remote.available():
+            raise requests.ConnectionError(f"{remote.name}: 連続失敗のため取得を停止中")
+        remote.acquire()
+        try:
+            r = get_session().get(url, timeout=HTTP_TIMEOUT, headers=headers)
+        except Exception:
+            remote.failure()
+            raise
+        STATS.incr('feed.requests')
+        STATS.incr('feed.bytes', len(r.content))
+        # cached_get と同様、相手サーバの不調（429・5xx）だけを失敗として数える
+        if r.status_code == 429 or r.status_code >= 500:
+            remote.failure()
+        else:
+            remote.success()
+        if r.status_code == 304 and meta:
+            print("DVBフィード: 未更新（304）。スナップショットを使用。")
+            return snapshot()
+        r.raise_for_status()
+    except Exception as e:
+        if meta:
+            print(f"DVBフィード取得エラー: {e}。スナップショットを使用。")
+            return snapshot()
+        raise
+    if not CACHE_DISABLED:
+        try:
+            os.makedirs(snapshot_dir, exist_ok=True)
+            with open(body_path, 'wb') as f:
+                f.write(r.content)
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump({'url': url, 'etag': r.headers.get('ETag'),
+                           'last_modified': r.headers.get('Last-Modified')}, f)
+        except OSError as e:
+            print(f"フィードスナップショット保存エラー: {e}")
+    return r.content
+
+def iter_feed_items(data):
+    """RSSのバイト列を iterparse で1件ずつ解析し、記事dictを遅延生成する"""
+    for _, elem in ET.iterparse(io.BytesIO(data), events=('end',)):
+        if elem.tag != 'item':
+            continue
+        ce = elem.find(CONTENT_NS)
+        content_raw = (ce.text if ce is not None else elem.findtext('description', '')) or ''
+        content_text = re.sub(r'<[^>]+>', ' ', content_raw)
+        content_text = re.sub(r'\s+', ' ', content_text).strip()
+        item = {
+            'title': elem.findtext('title', '').strip(),
+            'url': elem.findtext('link', '').strip(),
+            'content': content_text[:3000],
+            'source': 'DVB'
+        }
+        elem.clear()
+        yield item
 
-def fetch_dvb_feed():
+def iter_dvb_feed(url=DVB_FEED):
+    """DVBフィードの記事を先頭から遅延生成する（select_articles は順位付けのため最後まで読む）"""
     try:
-        r = requests.get(DVB_FEED, timeout=15, headers={'User-Agent': 'Mozilla/5.0'})
-        root = ET.fromstring(r.content)
-        items = []
-        for item in root.find('channel').findall('item'):
-            ce = item.find('{http://purl.org/rss/1.0/modules/content/}encoded')
-            content_raw = (ce.text if ce is not None else item.findtext('description', '')) or ''
-            content_text = re.sub(r'<[^>]+>', ' ', content_raw)
-            content_text = re.sub(r'\s+', ' ', content_text).strip()
-            items.append({
-                'title': item.findtext('title', '').strip(),
-                'url': item.findtext('link', '').strip(),
-                'content': content_text[:3000],
-                'source': 'DVB'
-            })
-        return items
+        data = fetch_feed_bytes(url)
+        yield from iter_feed_items(data)
     except Exception as e:
         print(f"DVBフィードエラー: {e}")
-        return []
 
-def fetch_article_detail(url):
-    """記事URLにアクセスして本文を取得"""
+@lru_cache(maxsize=256)
+def extract_article_text(html):
+    """記事HTMLから本文段落（最大15段落）を抽出する。同じHTMLは再解析しない"""
+    soup = BeautifulSoup(html, 'lxml')
+    paragraphs = soup.find_all('p')
+    text = ' '.join(p.get_text(strip=True) for p in paragraphs[:15])
+    return text[:4000]
+
+def fetch_article_detail_ex(url):
+    """記事URLの本文を (本文, ネットワークを使ったか) で返す"""
     try:
-        r = requests.get(url, timeout=15, headers={'User-Agent': 'Mozilla/5.0'})
-        soup = BeautifulSoup(r.text, 'lxml')
-        # 本文段落を最大15段落取得
-        paragraphs = soup.find_all('p')
-        text = ' '.join(p.get_text(strip=True) for p in paragraphs[:15])
-        return text[:4000]
+        html, network = cached_get(url)
+        return extract_article_text(html), network
     except Exception as e:
         print(f"  記事取得エラー({url[:40]}): {e}")
-        return ''
+        return '', True
 
 def categorize(title, content):
-    text = (title + ' ' + content).lower()
-    if any(w in text for w in ['military', 'airstrike', 'coup', 'junta', 'war', 'attack', 'bomb', 'killed', 'fighting', 'troops']):
-        return 'tp', '内戦・軍事'
-    if any(w in text for w in ['economy', 'trade', 'investment', 'business', 'dam', 'infrastructure', 'border', 'price', 'currency']):
-        return 'ts', '経済・貿易'
-    if any(w in text for w in ['refugee', 'civilian', 'humanitarian', 'rohingya', 'displaced', 'human rights', 'missing', 'women', 'children']):
-        return 'ti', '人道・難民'
-    return 'tc', '文化・社会'
-
-def is_used(title, used_list):
-    tl = title.lower()
-    for used in used_list:
-        ul = used.lower()
-        words = [w for w in tl.split() if len(w) > 5]
-        if sum(1 for w in words if w in ul) >= 2:
-            return True
-    return False
+    return analyze_article(title, content)['category']
 
 # =====================================================================
-# 解説生成（記事固有の内容を使用）
+# 使用済み記事の履歴（追記専用ログ＋圧縮スナップショット）
 # =====================================================================
 
-def build_kaisetsu_from_content(title_en, content_en, url):
+HISTORY_FIELDS = ['date', 'title', 'url', 'hash']
+
+def history_record(ds, a):
+    """記事1本分の履歴レコード（本文のハッシュは同じ記事の再掲検出用）"""
+    return {
+        'date': ds, 'title': unicodedata.normalize('NFC', a['title'][:80]), 'url': a.get('url', ''),
+        'hash': hashlib.sha256(a.get('content', '').encode('utf-8')).hexdigest()[:16],
+    }
+
+def _history_key(r):
+    return (r['date'], r['title'], r['url'])
+
+class HistoryStore:
+    """
+    使用済み記事の履歴。圧縮済みスナップショット（history.json）と、その後の追記分を
+    1行1件で持つ追記専用ログ（history.jsonl）からなる。追記はログ末尾への O(1) の書き込みと fsync のみで、
+    compact() でログをスナップショットに畳み込む（日付・タイトル順に整列し重複を除く）。
     """
-    記事の英語原文から記事固有の解説3ポイントを生成する。
-    汎用テンプレートは使わない。各ポイントは記事の具体的な情報を含む。
 
-    手順:
-    1. 原文から「誰が・何を・どこで・いつ・なぜ」の情報を抽出
-    2. その情報を使って3ポイントの解説を日本語で構成
-    3. 翻訳ではなく構造化した情報から日本語テキストを作成
+    def __init__(self, snapshot=HISTORY_SNAPSHOT, log=HISTORY_LOG):
+        self.snapshot_path = snapshot
+        self.log_path = log
+        self.records = []
+        self.log_count = 0
+
+    @classmethod
+    def load(cls, snapshot=HISTORY_SNAPSHOT, log=HISTORY_LOG, legacy=HISTORY_LEGACY):
+        store = cls(snapshot, log)
+        if not os.path.exists(snapshot) and not os.path.exists(log) and os.path.exists(legacy):
+            store.records = cls.from_legacy(legacy)
+            store.compact()
+            undated = sum(1 for r in store.records if not r['date'])
+            print(f"履歴: {legacy} から {len(store.records)}件を移行（うち日付無し {undated}件）")
+            return store
+        try:
+            with open(snapshot, 'r', encoding='utf-8') as f:
+                store.records = [dict(zip(HISTORY_FIELDS, row)) for row in json.load(f)['records']]
+        except (OSError, ValueError, KeyError):
+            pass
+        seen = {_history_key(r) for r in store.records}
+        try:
+            with open(log, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        r = json.loads(line)
+                    except ValueError:
+                        continue   # 追記中に止まった末尾の欠けた行
+                    store.log_count += 1
+                    if _history_key(r) not in seen:
+                        seen.add(_history_key(r))
+                        store.records.append(r)
+        except OSError:
+            pass
+        return store
+
+    @staticmethod
+    def from_legacy(path):
+        """
+        旧形式の used-news.txt（日付|タイトル）を読み込む。BOM・コメント行を除き、
+        改行が失われて1行に連結されたレコードも日付で分割する。文字化けしたタイトルは
+        元の文字列を復元できないため、重複判定に使えるようそのまま残す。
+        日付の無いタイトルだけの行も旧 load_used では使用済み扱いだったため、date='' のレコードとして残す。
+        """
+        with open(path, 'rb') as f:
+            text = unicodedata.normalize('NFC', f.read().decode('utf-8-sig', errors='replace'))
+        records = []
+        for line in text.split('\n'):
+            if line.lstrip().startswith('#'):
+                continue
+            head, *rest = re.split(r'(\d{4}-\d{2}-\d{2})\|', line)
+            pairs = [('', head)] + list(zip(rest[0::2], rest[1::2]))
+            for ds, title in pairs:
+                if title.strip():
+                    records.append({'date': ds, 'title': title.strip(), 'url': '', 'hash': ''})
+        return records
+
+    def lines(self):
+        """旧 used-news.txt と同じ行（日付無しのレコードはタイトルのみ）"""
+        return [f"{r['date']}|{r['title']}" if r['date'] else r['title'] for r in self.records]
+
+    def titles(self, n=None):
+        """直近 n 件（省略時は全件）のタイトル"""
+        recent = self.records if n is None else self.records[-n:]
+        return [r['title'] for r in recent]
+
+    def append(self, records):
+        """レコードをログ末尾に追記する（output_transaction() の中では確定時に追記）"""
+        if not records:
+            return
+        append_durable(self.log_path, ''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in records))
+        self.records.extend(records)
+        self.log_count += len(records)
+
+    def compact(self):
+        """全件を日付・タイトル順のスナップショットに書き出し、ログを空にする"""
+        merged = {_history_key(r): r for r in self.records}
+        self.records = sorted(merged.values(), key=lambda r: (r['date'], r['title']))
+        # 1件1行の配列にして、圧縮時の git の差分を読めるようにする
+        rows = ',\n'.join(json.dumps([r[k] for k in HISTORY_FIELDS], ensure_ascii=False, separators=(',', ':'))
+                          for r in self.records)
+        atomic_write(self.snapshot_path, f'{{"fields":{json.dumps(HISTORY_FIELDS, separators=(",", ":"))},"records":[\n{rows}\n]}}\n')
+        # スナップショットの後でログを空にする（間で止まってもレコードは重複除去されるだけ）
+        atomic_write(self.log_path, '')
+        self.log_count = 0
+
+    def maybe_compact(self, every=HISTORY_COMPACT_EVERY):
+        if self.log_count >= every:
+            self.compact()
+            print(f"履歴: ログを圧縮（全{len(self.records)}件）")
+
+# =====================================================================
+# 重複判定インデックス（使用済みタイトルの転置インデックス）
+# =====================================================================
+
+class DedupIndex:
     """
-    full_text = (title_en + " " + content_en).strip()
+    使用済みタイトルの単語→行番号の転置インデックス。前回保存時からの追加分だけ差分更新する。
+    旧 is_used は「タイトルの単語が使用済み行に部分文字列として含まれるか」で判定していたため、
+    照合は単語の前方一致で行う（airstrike → airstrikes、sentence → sentenced も一致）。
+    """
+    # 単語の切り出し方を変えたら上げる（保存済みインデックスを作り直させる）
+    VERSION = 2
 
-    # 人物名の抽出（大文字始まり2語以上の固有名詞）
-    person_names = re.findall(r'\b([A-Z][a-z]+ (?:[A-Z][a-z]+ )?[A-Z][a-z]+)\b', full_text)
-    persons = list(dict.fromkeys(person_names))[:4]  # 重複除去・最大4名
+    def __init__(self, min_word_len=6, min_shared=2):
+        self.min_word_len = min_word_len
+        self.min_shared = min_shared
+        self.postings = {}
+        self.count = 0
+        self.digest = hashlib.sha256().hexdigest()
+        self._vocab = None
 
-    # 数字・統計の抽出
-    numbers = re.findall(r'\b(\d[\d,\.]*(?:\s*(?:people|civilians|homes|million|thousand|percent|%|km|days|years|villages|killed|dead|displaced)))', full_text, re.IGNORECASE)
+    def tokens(self, text):
+        """小文字化し、曲がった引用符をそろえ、所有格の 's を除いた単語（min_word_len 文字以上）"""
+        text = text.lower().replace('\u2019', "'").replace('\u2018', "'")
+        words = (re.sub(r"'s$", '', w) for w in re.findall(r"\w+(?:'\w+)*", text))
+        return {w for w in words if len(w) >= self.min_word_len}
 
-    # 地名抽出
-    myanmar_places = ['Rakhine', 'Sagaing', 'Ayeyarwady', 'Kachin', 'Shan', 'Karen', 'Kayin',
-                       'Mandalay', 'Naypyidaw', 'Yangon', 'Bago', 'Magway', 'Chin', 'Mon', 'Tanintharyi']
-    places_found = [p for p in myanmar_places if p.lower() in full_text.lower()]
-
-    # 組織名抽出
-    orgs = []
-    org_keywords = {
-        'SCEF': '民主抵抗連合SCEF',
-        'NUG': '国民統一政府（NUG）',
-        'Arakan Army': 'アラカン軍（AA）',
-        'ICRC': '赤十字国際委員会（ICRC）',
-        'ASEAN': 'ASEAN',
-        'Fortify Rights': 'フォーティファイ・ライツ',
-        'KNU': 'カレン民族同盟（KNU）',
-        'KIO': 'カチン独立機構（KIO）',
-        'UNHCR': '国連難民高等弁務官事務所（UNHCR）',
-        'United Nations': '国連',
-        'UN Security Council': '国連安保理',
-    }
-    for key, val in org_keywords.items():
-        if key.lower() in full_text.lower():
-            orgs.append(val)
+    def add(self, line):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            return
+        doc = self.count
+        self.count += 1
+        for w in self.tokens(line):
+            self.postings.setdefault(w, []).append(doc)
+        self._vocab = None
 
-    # 英語テキストを最大2000字に制限して翻訳
-    content_for_translation = full_text[:2000]
+    def matching(self, word):
+        """word で始まる索引語（整列済みの語彙を二分探索する）"""
+        if self._vocab is None:
+            self._vocab = sorted(self.postings)
+        i = bisect.bisect_left(self._vocab, word)
+        while i < len(self._vocab) and self._vocab[i].startswith(word):
+            yield self._vocab[i]
+            i += 1
 
+    def seen(self, title):
+        """共通単語数が min_shared 以上の既存エントリがあれば True"""
+        hits = {}
+        for w in self.tokens(title):
+            docs = set()
+            for term in self.matching(w):
+                docs.update(self.postings[term])
+            for doc in docs:
+                hits[doc] = hits.get(doc, 0) + 1
+                if hits[doc] >= self.min_shared:
+                    return True
+        return False
+
+    @classmethod
+    def from_lines(cls, lines, **kw):
+        idx = cls(**kw)
+        for l in lines:
+            idx.add(l)
+        return idx
+
+    @staticmethod
+    def _digest(lines):
+        return hashlib.sha256('\n'.join(lines).encode('utf-8')).hexdigest()
+
+    @classmethod
+    def load(cls, history=None, index_path=None, **kw):
+        """
+        保存済みインデックスを読み込み、履歴の追加分だけを索引に加える。
+        保存時の履歴が今の履歴の先頭と一致しない場合（ログの圧縮で並び順が変わった等）は作り直す。
+        """
+        kw.setdefault('min_word_len', DEDUP_MIN_WORD_LEN)
+        kw.setdefault('min_shared', DEDUP_MIN_SHARED)
+        index_path = index_path or os.path.join(CACHE_DIR, 'dedup-index.json')
+        lines = (history or HistoryStore.load()).lines()
+        idx = cls(**kw)
+        try:
+            if CACHE_DISABLED:
+                raise OSError('cache disabled')
+            with open(index_path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            if (saved.get('version') == cls.VERSION and saved['min_word_len'] == idx.min_word_len
+                    and saved['count'] <= len(lines)
+                    and cls._digest(lines[:saved['count']]) == saved['digest']):
+                idx.postings = saved['postings']
+                idx.count = saved['count']
+        except (OSError, ValueError, KeyError):
+            pass
+        for l in lines[idx.count:]:
+            idx.add(l)
+        idx.digest = cls._digest(lines)
+        return idx
+
+    def save(self, index_path=None):
+        if CACHE_DISABLED:
+            return
+        index_path = index_path or os.path.join(CACHE_DIR, 'dedup-index.json')
+        try:
+            os.makedirs(os.path.dirname(index_path) or '.', exist_ok=True)
+            tmp = index_path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'version': self.VERSION, 'min_word_len': self.min_word_len, 'count': self.count,
+                           'digest': self.digest, 'postings': self.postings}, f, ensure_ascii=False)
+            os.replace(tmp, index_path)
+        except OSError as e:
+            print(f"重複インデックス保存エラー: {e}")
+
+def is_used(title, used_list):
+    """used_list（行のリスト or DedupIndex）に類似タイトルがあるか判定"""
+    if not isinstance(used_list, DedupIndex):
+        used_list = DedupIndex.from_lines(used_list, min_word_len=DEDUP_MIN_WORD_LEN,
+                                          min_shared=DEDUP_MIN_SHARED)
+    return used_list.seen(title)
+
+# =====================================================================
+# 候補記事のランキング（TF-IDF・コサイン類似度による新規性と多様性）
+# =====================================================================
+
+# NumPy があれば行列積で類似度をまとめて計算し、無ければ疎ベクトルの内積で同じ値を求める
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+RANK_HISTORY = 300             # 新規性の比較対象にする直近の使用済みタイトル数
+RANK_NOVELTY_WEIGHT = 1.0      # 履歴との最大類似度が低いほど高得点
+RANK_RECENCY_WEIGHT = 0.3      # フィードの先頭（新しい記事）ほど高得点
+RANK_RICHNESS_WEIGHT = 0.2     # フィード本文が十分で詳細取得が不要な記事は加点
+RANK_REDUNDANCY_WEIGHT = 1.0   # 選定済みの記事と似ているほど減点
+RANK_CATEGORY_BONUS = 0.15     # 選定済みの記事と分類が異なれば加点
+
+RANK_STOPWORDS = frozenset(
+    'the and for with that this from have has had was were are its his her their they them '
+    'been will would said says also after over into about more than which who what when where '
+    'while amid against under between during other some such only not but can could may new'.split())
+
+def recent_history_titles(n=RANK_HISTORY, history=None):
+    """使用済み履歴の直近 n 件のタイトル"""
+    return (history or HistoryStore.load()).titles(n)
+
+def rank_terms(text):
+    return [w for w in re.findall(r"[a-z][a-z'-]{2,}", text.lower()) if w not in RANK_STOPWORDS]
+
+def tfidf_vectors(docs):
+    """文書（語リスト）ごとの L2 正規化済み TF-IDF ベクトル（語→重み の dict）"""
+    df = {}
+    for terms in docs:
+        for t in set(terms):
+            df[t] = df.get(t, 0) + 1
+    n = len(docs)
+    vecs = []
+    for terms in docs:
+        tf = {}
+        for t in terms:
+            tf[t] = tf.get(t, 0) + 1
+        v = {t: (1 + math.log(c)) * (math.log((1 + n) / (1 + df[t])) + 1) for t, c in tf.items()}
+        norm = math.sqrt(sum(w * w for w in v.values())) or 1.0
+        vecs.append({t: w / norm for t, w in v.items()})
+    return vecs
+
+def cosine_matrix(rows, cols):
+    """rows × cols のコサイン類似度（ベクトルは正規化済み）を二次元リストで返す"""
+    if not rows or not cols:
+        return [[] for _ in rows]
+    if np is not None:
+        vocab = {}
+        for v in itertools.chain(rows, cols):
+            for t in v:
+                vocab.setdefault(t, len(vocab))
+        def dense(vs):
+            m = np.zeros((len(vs), len(vocab)))
+            for i, v in enumerate(vs):
+                for t, w in v.items():
+                    m[i, vocab[t]] = w
+            return m
+        return (dense(rows) @ dense(cols).T).tolist()
+    out = []
+    for r in rows:
+        out.append([sum(w * c.get(t, 0.0) for t, w in r.items()) if len(r) <= len(c)
+                    else sum(w * r.get(t, 0.0) for t, w in c.items()) for c in cols])
+    return out
+
+def rank_candidates(cands, history, k=3):
+    """
+    フィードの候補記事を一括で採点し、上位 k 本を選ぶ。
+    得点 = 履歴に対する新規性 + フィード内の新しさ + 本文の充実度（詳細取得が不要か）。
+    選定済みの記事と似た候補は減点、分類が異なる候補は加点しながら1本ずつ貪欲に選ぶ。
+    """
+    if not cands:
+        return []
+    docs = [rank_terms(a['title'] + ' ' + a['title'] + ' ' + a.get('content', '')[:1500]) for a in cands]
+    docs += [rank_terms(t) for t in history]
+    vecs = tfidf_vectors(docs)
+    sims = cosine_matrix(vecs[:len(cands)], vecs)
+    base, cats = [], []
+    for i, a in enumerate(cands):
+        past = sims[i][len(cands):]
+        novelty = 1.0 - (max(past) if past else 0.0)
+        recency = 1.0 - i / len(cands)
+        richness = 1.0 if len(a.get('content', '')) >= 200 else 0.0
+        base.append(RANK_NOVELTY_WEIGHT * novelty + RANK_RECENCY_WEIGHT * recency
+                    + RANK_RICHNESS_WEIGHT * richness)
+        cats.append(categorize(a['title'], a.get('content', ''))[0])
+
+    chosen = []
+    while len(chosen) < min(k, len(cands)):
+        def score(i):
+            redundancy = max((sims[i][j] for j in chosen), default=0.0)
+            bonus = RANK_CATEGORY_BONUS if cats[i] not in {cats[j] for j in chosen} else 0.0
+            return base[i] - RANK_REDUNDANCY_WEIGHT * redundancy + bonus
+        best = max((i for i in range(len(cands)) if i not in chosen), key=score)
+        print(f"選定[{len(chosen)+1}]（得点 {score(best):.2f}）: {cands[best]['title'][:60]}")
+        chosen.append(best)
+    STATS.incr('selection.ranked_candidates', len(cands))
+    return [cands[i] for i in chosen]
+
+# =====================================================================
+# 解説生成（記事固有の内容を使用）
+# =====================================================================
+
+def kaisetsu_sources(title_en, content_en):
+    """解説3ポイントの翻訳元となる英文を記事本文から組み立てる"""
     # ポイント1：記事の核心（何が起きたか・誰が関与しているか）の解説
     # タイトルと最初の段落から構成
     first_para = content_en.split('. ')[0:3]
     first_para_text = '. '.join(first_para)[:800]
     p1_en = f"Background: {title_en}. {first_para_text}"
-    p1_ja_raw = translate_robust(p1_en)
 
     # ポイント2：国際社会・ASEAN・日本の対応に関する部分を抽出
-    intl_sentences = [s.strip() for s in content_en.split('.')
-                      if any(w in s.lower() for w in ['japan', 'asean', 'united nations', 'un ', 'international',
-                                                        'sanctions', 'response', 'statement', 'urged', 'demanded',
-                                                        'called for', 'condemned', 'support'])]
+    intl_sentences = [s.strip() for s in content_en.split('.') if MATCHER.intl_re.search(s.lower())]
     if intl_sentences:
         p2_source = '. '.join(intl_sentences[:3])[:600]
         p2_en = f"International response: {p2_source}"
     else:
         p2_en = f"International context for: {title_en}. ASEAN and Japan's position on this development."
-    p2_ja_raw = translate_robust(p2_en)
 
     # ポイント3：日本・在日ミャンマー人への影響
     # NL-DGの文脈（建設業向けミャンマー人材）を必ず含める
-    impact_sentences = [s.strip() for s in content_en.split('.')
-                        if any(w in s.lower() for w in ['workers', 'civilians', 'people', 'residents',
-                                                          'community', 'families', 'economy', 'business'])]
+    impact_sentences = [s.strip() for s in content_en.split('.') if MATCHER.impact_re.search(s.lower())]
     if impact_sentences:
         p3_source = '. '.join(impact_sentences[:2])[:400]
         p3_en = f"Impact on people and workers: {p3_source}. Implications for Myanmar workers in Japan and construction industry."
     else:
         p3_en = f"Impact of this development on Myanmar residents in Japan and construction workforce managed by companies like NL-DG."
-    p3_ja_raw = translate_robust(p3_en)
 
-    # 翻訳結果が不十分な場合のフォールバック処理
-    def clean_point(text, fallback_hint):
-        if not text or not is_japanese(text):
+    return p1_en, p2_en, p3_en, first_para_text
+
+def build_kaisetsu_from_content(title_en, content_en, url, translated=None):
+    """
+    記事の英語原文から記事固有の解説3ポイントを生成する。
+    汎用テンプレートは使わない。各ポイントは記事の具体的な情報を含む。
+    translated に (p1, p2, p3) の翻訳済みテキストを渡した場合は翻訳を省略する。
+
+    手順:
+    1. 原文から「誰が・何を・どこで・いつ・なぜ」の情報を抽出
+    2. その情報を使って3ポイントの解説を日本語で構成
+    3. 翻訳ではなく構造化した情報から日本語テキストを作成
+    """
+    full_text = (title_en + " " + content_en).strip()
+
+    # 人物名の抽出（大文字始まり2語以上の固有名詞）
+    person_names = re.findall(r'\b([A-Z][a-z]+ (?:[A-Z][a-z]+ )?[A-Z][a-z]+)\b', full_text)
+    persons = list(dict.fromkeys(person_names))[:4]  # 重複除去・最大4名
+
+    # 数字・統計の抽出
+    numbers = re.findall(r'\b(\d[\d,\.]*(?:\s*(?:people|civilians|homes|million|thousand|percent|%|km|days|years|villages|killed|dead|displaced)))', full_text, re.IGNORECASE)
+
+    # 地名・組織名・解説トピックは1回の走査でまとめて抽出
+    analysis = analyze_article(title_en, content_en)
+    places_found = analysis['places']
+    orgs = analysis['orgs']
+
+    p1_en, p2_en, p3_en, first_para_text = kaisetsu_sources(title_en, content_en)
+    if translated is None:
+        translated = (translate_robust(p1_en), translate_robust(p2_en), translate_robust(p3_en))
+    p1_ja_raw, p2_ja_raw, p3_ja_raw = translated
+
+    # 翻訳結果が不十分な場合のフォールバック処理
+    def clean_point(text, fallback_hint):
+        if not text or not is_japanese(text):
+            STATS.incr('kaisetsu.clean_point_fallback')
             return f"{apply_proper_nouns(fallback_hint[:200])}。日本在住のミャンマー人約6万人にとっても、この動向は精神的・社会的に大きな影響を持ちます。NL-DGのようなミャンマー人材受け入れ事業者は状況を注視する必要があります。"
         # "Background:", "International response:", "Impact"等の接頭辞を除去
         text = re.sub(r'^(背景|国際的な対応|影響|Background|International|Impact)[：:]\s*', '', text)
         # 100文字未満の場合は補足を追加
         if len(text) < 100:
+            STATS.incr('kaisetsu.clean_point_padded')
             text += f"この問題はミャンマーの政治・人道状況に深く関わるものであり、日本在住のミャンマー人にとっても注目すべき動向です。"
         return text
 
@@ -251,39 +1542,8 @@ def build_kaisetsu_from_content(title_en, content_en, url):
 
     # ポイントタイトルは記事の核心を反映した固有のものにする
     # キーワードに基づいて動的に決定
-    tl = full_text.lower()
-    if any(w in tl for w in ['suu kyi', 'aung san']):
-        pt1 = "アウンサン・スーチー氏をめぐる最新動向と軍政の意図"
-        pt2 = "ASEAN・国連の対応と日本政府の立場"
-        pt3 = "在日ミャンマー人への影響とNL-DGの支援現場"
-    elif any(w in tl for w in ['scef', 'nug', 'resistance', 'r2p']):
-        pt1 = "SCEFと国際的正統性をめぐる最新の動き"
-        pt2 = "国連・米国・欧州と日本の対応の差異"
-        pt3 = "ミャンマー情勢の変化が日本のミャンマー人材事業に与える影響"
-    elif any(w in tl for w in ['airstrike', 'attack', 'bombing', 'killed', 'civilian']):
-        pt1 = f"今回の攻撃・戦闘の具体的な状況と被害規模"
-        pt2 = "人道支援機関・日本政府の緊急対応と課題"
-        pt3 = "出身地域への攻撃が在日ミャンマー人労働者に与える精神的影響"
-    elif any(w in tl for w in ['china', 'russia', 'weapons', 'arms', 'military aid']):
-        pt1 = "中国・ロシアのミャンマー軍政への具体的な軍事支援の内容"
-        pt2 = "国連安保理での拒否権行使と日本の外交的立場"
-        pt3 = "軍政の長期化が日本のミャンマー人材調達に与えるリスク"
-    elif any(w in tl for w in ['rohingya', 'stateless', 'refugee']):
-        pt1 = "ロヒンギャ問題の最新状況と国際社会の認識"
-        pt2 = "UNHCR・ASEAN・日本政府の難民対応"
-        pt3 = "日本在住のミャンマー人・ロヒンギャへの支援の課題"
-    elif any(w in tl for w in ['flood', 'dam', 'disaster', 'typhoon', 'earthquake']):
-        pt1 = "自然災害と武力衝突が重なる複合的人道危機の実態"
-        pt2 = "国際緊急支援と軍政による移動制限の矛盾"
-        pt3 = "被災地出身の在日ミャンマー人への精神的サポートの必要性"
-    elif any(w in tl for w in ['election', 'vote', 'political', 'coup']):
-        pt1 = "今回の政治的動向が示すミャンマー軍政の戦略"
-        pt2 = "民主主義回復に向けた国際社会の圧力と日本の対話路線"
-        pt3 = "政治状況の変化が日本在住のミャンマー人コミュニティに与える影響"
-    elif any(w in tl for w in ['economy', 'trade', 'investment', 'sanction']):
-        pt1 = "経済制裁・貿易動向がミャンマー経済に与える具体的影響"
-        pt2 = "日本企業のミャンマー事業継続と撤退判断の現状"
-        pt3 = "在日ミャンマー人労働者の送金環境と生活への影響"
+    if analysis['topic']:
+        pt1, pt2, pt3 = analysis['topic']
     else:
         # 人物名・地名・組織名から動的にタイトルを生成
         who = persons[0] if persons else "関係者"
@@ -299,32 +1559,61 @@ def build_kaisetsu_from_content(title_en, content_en, url):
 # HTML記事ブロック生成
 # =====================================================================
 
-def build_article_html(a, dj):
+def article_segments(a):
+    """記事1本分の翻訳対象（タイトル・本文・解説3ポイント）を英文のリストで返す"""
+    title_en = a['title']
+    content_en = a.get('content', '')
+    body_source = re.sub(r'\s+', ' ', content_en[:800]).strip() if content_en else title_en
+    p1_en, p2_en, p3_en, _ = kaisetsu_sources(title_en, content_en)
+    return [title_en, body_source, p1_en, p2_en, p3_en]
+
+def build_article_record(a, dj, translated=None):
+    """
+    記事1本分の表示データ（翻訳・解説を含む）を作る。
+    translated に article_segments() と同順の翻訳結果を渡すと個別翻訳を省略する。
+    """
     title_en = a['title']
     url = a['url']
     src = a['source']
     content_en = a.get('content', '')
+    body_source = article_segments(a)[1]
 
     tc, tl = categorize(title_en, content_en)
 
     print(f"  タイトル翻訳: {title_en[:50]}")
-    ja_title = translate_robust(title_en)
+    ja_title = translated[0] if translated else translate_robust(title_en)
     if not is_japanese(ja_title):
         print(f"  タイトル翻訳失敗。固有名詞変換のみ実施。")
+        STATS.incr('article.title_fallback')
         ja_title = apply_proper_nouns(title_en)
 
     print(f"  本文翻訳...")
-    body_source = re.sub(r'\s+', ' ', content_en[:800]).strip() if content_en else title_en
-    ja_body = translate_robust(body_source)
+    ja_body = translated[1] if translated else translate_robust(body_source)
     if not is_japanese(ja_body):
+        STATS.incr('article.body_fallback')
         ja_body = apply_proper_nouns(body_source)
     # 本文が短すぎる場合は補足
     if len(ja_body) < 80:
         ja_body = ja_title + "。詳細については原記事をご参照ください。"
 
     print(f"  解説生成（記事固有の内容）...")
-    pt1, p1, pt2, p2, pt3, p3 = build_kaisetsu_from_content(title_en, content_en, url)
+    pt1, p1, pt2, p2, pt3, p3 = build_kaisetsu_from_content(
+        title_en, content_en, url, translated=tuple(translated[2:5]) if translated else None)
 
+    return {
+        'title_en': title_en, 'url': url, 'source': src, 'tag': [tc, tl],
+        'ja_title': ja_title, 'ja_body': ja_body,
+        'points': [[pt1, p1], [pt2, p2], [pt3, p3]],
+    }
+
+def render_article_block(art, dj):
+    """記事データ1本分のHTMLブロック"""
+    tc, tl = art['tag']
+    src = art['source']
+    points = ''.join(
+        f'        <div class="k-point"><div class="k-point-title">{pt}</div><p>{p}</p></div>\n'
+        for pt, p in art['points']
+    )
     return (
         f'  <div class="article">\n'
         f'    <div class="art-head">\n'
@@ -333,132 +1622,29 @@ def build_article_html(a, dj):
         f'        <span class="tag tsrc">DVB</span>\n'
         f'        <span class="art-date">{dj}</span>\n'
         f'      </div>\n'
-        f'      <div class="art-title">{ja_title}</div>\n'
+        f'      <div class="art-title">{art["ja_title"]}</div>\n'
         f'      <div class="art-src">出典：{src}　{dj}</div>\n'
         f'    </div>\n'
         f'    <div class="art-body">\n'
-        f'      <div class="art-news">{ja_body}</div>\n'
+        f'      <div class="art-news">{art["ja_body"]}</div>\n'
         f'      <div class="kaisetsu">\n'
         f'        <div class="k-label"><span>解説</span>日本人が知っておきたい背景</div>\n'
-        f'        <div class="k-point"><div class="k-point-title">{pt1}</div><p>{p1}</p></div>\n'
-        f'        <div class="k-point"><div class="k-point-title">{pt2}</div><p>{p2}</p></div>\n'
-        f'        <div class="k-point"><div class="k-point-title">{pt3}</div><p>{p3}</p></div>\n'
+        f'{points}'
         f'      </div>\n'
         f'    </div>\n'
-        f'    <a class="art-link" href="{url}" target="_blank">→ {src} 原記事を読む</a>\n'
+        f'    <a class="art-link" href="{art["url"]}" target="_blank">→ {src} 原記事を読む</a>\n'
         f'  </div>'
-    ), ja_title
-
-def update_archive(ds, dj, vs, arts, ja_titles):
-    try:
-        c = open('archive.html', 'r', encoding='utf-8').read()
-        href_target = f"news-{ds}.html"
-        if href_target in c:
-            print(f"archive: {href_target} 既登録。スキップ。")
-        else:
-            tags = ''.join(
-                f"<span class='tag {categorize(a['title'], a.get('content',''))[0]}'>"
-                f"{categorize(a['title'], a.get('content',''))[1]}</span>"
-                for a in arts[:3]
-            )
-            # タイトルはフルタイトルを使う（省略しない）
-            titles_html = ''.join(f"<li>{t[:40]}{'...' if len(t)>40 else ''}</li>" for t in ja_titles[:3])
-            card = (
-                f"\n    <!-- {vs} -->\n"
-                f"    <div class='card'>"
-                f"<div class='card-top'><div class='card-vol'>{vs}</div>"
-                f"<div class='card-date'>{dj}</div></div>"
-                f"<div class='card-body'><div class='card-tags'>{tags}</div>"
-                f"<ul class='card-titles'>{titles_html}</ul></div>"
-                f"<div class='card-footer'>"
-                f"<a href='{href_target}' class='card-link'>▶ この号を読む</a>"
-                f"</div></div>"
-            )
-            pos = c.find('<div class="grid">') + len('<div class="grid">')
-            c = c[:pos] + card + c[pos:]
-            print(f"archive: {vs} カード追加完了")
-
-        card_count = len(re.findall(r"href='news-\d{4}-\d{2}-\d{2}\.html'", c))
-        c = re.sub(
-            r'(<span class="count-badge">)\d+号(</span>)',
-            f'\\g<1>{card_count}号\\g<2>', c
-        )
-        open('archive.html', 'w', encoding='utf-8').write(c)
-        print(f"archive.html更新完了（カード数: {card_count}）")
-    except Exception as e:
-        print(f"archive更新エラー: {e}")
-        import traceback; traceback.print_exc()
-
-
-# =====================================================================
-# メイン処理
-# =====================================================================
-
-def main():
-    print("=== ミャンマーニュース自動生成 v3.0 ===")
-    print("品質基準: 記事固有の詳細解説 / 汎用テンプレート禁止")
-    ds, dj = get_date_info()
-    vn = get_next_vol()
-    vs = f"Vol.{vn:03d}"
-    print(f"日付: {ds} / {dj} / {vs}")
-
-    out = f"news-{ds}.html"
-    if os.path.exists(out):
-        print(f"{out} 既存。終了。")
-        return
-
-    used = load_used()
-    all_arts = fetch_dvb_feed()
-
-    # 未使用記事を選定
-    selected = []
-    for a in all_arts:
-        if len(selected) >= 3:
-            break
-        if len(a['title']) < 15:
-            continue
-        if is_used(a['title'], used):
-            continue
-        # 詳細本文が不足している場合は記事URLにアクセスして取得
-        if len(a.get('content', '')) < 200:
-            print(f"  詳細取得: {a['url'][:60]}")
-            a['content'] = fetch_article_detail(a['url'])
-            time.sleep(1)
-        selected.append(a)
-        print(f"選定[{len(selected)}]: {a['title'][:60]}")
-
-    # フォールバック: 使用済みも含めて補完
-    if len(selected) < 3:
-        for a in all_arts:
-            if len(selected) >= 3:
-                break
-            if a not in selected:
-                if len(a.get('content', '')) < 200:
-                    a['content'] = fetch_article_detail(a['url'])
-                    time.sleep(1)
-                selected.append(a)
-                print(f"選定(FB)[{len(selected)}]: {a['title'][:60]}")
+    )
 
-    if not selected:
-        print("ERROR: 記事取得失敗。終了。")
-        return
-
-    # 各記事のHTMLブロックを生成
-    print("\n--- 記事HTML生成中 ---")
-    articles_html_parts = []
-    ja_titles = []
-    for i, a in enumerate(selected[:3]):
-        print(f"\n[記事{i+1}/{min(3, len(selected))}] {a['title'][:50]}")
-        art_html, ja_title = build_article_html(a, dj)
-        articles_html_parts.append(art_html)
-        ja_titles.append(ja_title)
-
-    arts_html = '\n'.join(articles_html_parts)
+def issue_summary(ja_titles):
     summary_titles = '」「'.join(t[:20] for t in ja_titles)
-    summary = f"本日は「{summary_titles}」の3本をお届けします。日本に暮らすミャンマー人と日本企業にとって重要な情報を解説します。"
+    return f"本日は「{summary_titles}」の3本をお届けします。日本に暮らすミャンマー人と日本企業にとって重要な情報を解説します。"
 
-    # HTMLファイル生成
-    html = f"""<!DOCTYPE html>
+def render_issue_page(issue):
+    """号データ（issues/news-YYYY-MM-DD.json の内容）から号のHTMLページ全体を生成する"""
+    vs, dj = issue['vol'], issue['date_ja']
+    arts_html = '\n'.join(render_article_block(art, dj) for art in issue['articles'])
+    return f"""<!DOCTYPE html>
 <html lang="ja">
 <head>
 <meta charset="UTF-8">
@@ -469,14 +1655,14 @@ def main():
 <title>ミャンマーニュース {vs} | {dj}</title>
 <link rel="preconnect" href="https://fonts.googleapis.com">
 <link href="https://fonts.googleapis.com/css2?family=Noto+Sans+JP:wght@400;700;900&display=swap" rel="stylesheet">
-<style>{CSS}</style>
+<link rel="stylesheet" href="{stylesheet('news', CSS)}">
 </head>
 <body>
 <header class="header"><div class="header-inner"><div class="logo">ミャンマーニュース</div><div class="header-right">毎朝8時更新　|　ミャンマーと日本をつなぐ</div></div></header>
 <nav class="nav-bar"><div class="nav-inner"><a href="index.html" class="nav-btn nav-btn-latest active-page">▶ 最新号</a><a href="archive.html" class="nav-btn nav-btn-archive">📚 バックナンバー一覧</a></div></nav>
 <div class="hero"><div class="hero-inner"><div class="vol">{vs}　|　{dj}</div><h1>ミャンマー最新ニュース 3選<br>日本人が知っておきたい背景</h1></div></div>
 <div class="wrap">
-  <div class="editor-note"><div class="en-label">本日のまとめ</div><p>{summary}</p></div>
+  <div class="editor-note"><div class="en-label">本日のまとめ</div><p>{issue['summary']}</p></div>
 {arts_html}
 </div>
 <div style="background:#f2f5fa;padding:32px 24px;text-align:center;"><a href="archive.html" style="display:inline-flex;align-items:center;gap:8px;background:#0D2B5E;color:#fff;padding:13px 28px;border-radius:8px;font-size:14px;font-weight:700;text-decoration:none;">📚 バックナンバー一覧へ戻る</a></div>
@@ -484,19 +1670,1071 @@ def main():
 </body>
 </html>"""
 
-    open(out, 'w', encoding='utf-8').write(html)
+# =====================================================================
+# 並列処理（取得・翻訳）
+# =====================================================================
+
+def _fetch_detail_paced(a, deadline=None):
+    """記事の詳細を取得する（相手サーバへの配慮は cached_get 内のホスト別レート制限で行う）"""
+    if expired(deadline):
+        print(f"  持ち時間切れ。詳細取得を省略: {a['url'][:60]}")
+        STATS.incr('budget.detail_skipped')
+        return a.get('content', '')
+    print(f"  詳細取得: {a['url'][:60]}")
+    return fetch_article_detail_ex(a['url'])[0]
+
+def fetch_details(arts, deadline=None):
+    """
+    本文が不足している記事の詳細をMAX_WORKERS並列で取得する（結果は元の記事順で反映）。
+    deadline を過ぎてから取りかかる記事はフィードの本文のまま進める。
+    """
+    need = [a for a in arts if len(a.get('content', '')) < 200]
+    if not need:
+        return
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(need))) as ex:
+        for a, content in zip(need, ex.map(lambda a: _fetch_detail_paced(a, deadline), need)):
+            a['content'] = content
+
+def translate_articles(segments, done=None, deadlines=None):
+    """
+    記事ごとのセグメントリストを翻訳し、同じ順序・同じ形で返す。
+    並列数1なら号全体を1つのバッチにまとめ、それ以外は記事単位のバッチを並列実行する。
+    done を渡すと記事の翻訳が終わるたびに done(記事の位置, 翻訳結果) を呼ぶ。
+    deadlines は記事内のセグメント位置ごとの締切。号全体のバッチでは締切の遅い（必須の）
+    セグメントを先に並べ、時間が足りなくなっても必須分から翻訳されるようにする。
+    """
+    deadlines = deadlines or []
+    limit = lambda j: deadlines[j] if j < len(deadlines) else None
+    if MAX_WORKERS == 1 or len(segments) <= 1:
+        order = sorted(((k, j) for k, seg in enumerate(segments) for j in range(len(seg))),
+                       key=lambda kj: (-(limit(kj[1]) or float('inf')), kj))
+        flat = translate_batch([segments[k][j] for k, j in order], [limit(j) for _, j in order])
+        out = [list(seg) for seg in segments]
+        for (k, j), t in zip(order, flat):
+            out[k][j] = t
+        for k in range(len(out)):
+            if done:
+                done(k, out[k])
+        return out
+
+    def job(k):
+        result = translate_batch(segments[k], [limit(j) for j in range(len(segments[k]))])
+        if done:
+            done(k, result)
+        return result
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(segments))) as ex:
+        return list(ex.map(job, range(len(segments))))
+
+# =====================================================================
+# 号マニフェストとバックナンバー一覧の生成
+# =====================================================================
+
+def read_manifest(path=MANIFEST):
+    """issues.jsonl を号の古い順に読み込む"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return [json.loads(l) for l in f if l.strip()]
+    except OSError:
+        return []
+
+def last_manifest_entry(path=MANIFEST):
+    """ファイル末尾だけを読んで最新号のエントリを返す（全体は読まない）"""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            buf = b''
+            while pos > 0:
+                step = min(4096, pos)
+                pos -= step
+                f.seek(pos)
+                buf = f.read(step) + buf
+                lines = [l for l in buf.split(b'\n') if l.strip()]
+                if len(lines) > 1 or (lines and pos == 0):
+                    return json.loads(lines[-1].decode('utf-8'))
+    except (OSError, ValueError):
+        pass
+    return None
+
+def append_manifest(entry, path=MANIFEST):
+    append_file(path, json.dumps(entry, ensure_ascii=False) + '\n')
+
+def manifest_from_archive_html(path='archive.html'):
+    """旧形式の archive.html のカードからマニフェストのエントリを復元する（初回移行用）"""
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        soup = BeautifulSoup(f.read(), 'lxml')
+    entries = []
+    for card in soup.select('div.card'):
+        link = card.select_one('a.card-link')
+        m = re.search(r'news-(\d{4}-\d{2}-\d{2})', link.get('href', '')) if link else None
+        vol = re.search(r'\d+', card.select_one('.card-vol').get_text())
+        if not m or not vol:
+            continue
+        tags = []
+        for t in card.select('.card-tags span'):
+            cls = [c for c in t.get('class', []) if c not in ('tag', 'card-tag')]
+            tags.append([cls[0] if cls else '', t.get_text(strip=True)])
+        entries.append({
+            'vol': int(vol.group()),
+            'date': m.group(1),
+            'date_ja': card.select_one('.card-date').get_text(strip=True),
+            'file': link['href'],
+            'tags': tags,
+            'titles': [li.get_text(strip=True) for li in card.select('.card-titles li')],
+        })
+    entries.sort(key=lambda e: (e['date'], e['vol']))
+    return entries
+
+def ensure_manifest(path=MANIFEST):
+    """
+    マニフェストが無ければ archive.html と月別ページ（archive-YYYY-MM.html）のカードから生成する。
+    archive.html には最新ARCHIVE_LATEST_CARDS号しか載らないため、月別ページと合わせても
+    総号数に足りない場合は、欠けたマニフェストで一覧を上書きしないよう移行せずに停止する。
+    """
+    if os.path.exists(path) or not os.path.exists('archive.html'):
+        return
+    print(f"{path} が無いため archive.html と月別ページから生成します")
+    pages = ['archive.html'] + sorted(f for f in os.listdir('.') if re.fullmatch(r'archive-\d{4}-\d{2}\.html', f))
+    by_file = {}
+    for page in pages:
+        for e in manifest_from_archive_html(page):
+            by_file.setdefault(e['file'], e)
+    entries = sorted(by_file.values(), key=lambda e: (e['date'], e['vol']))
+    with open('archive.html', 'r', encoding='utf-8-sig') as f:
+        badge = re.search(r'class="count-badge">(\d+)号', f.read())
+    if badge and len(entries) < int(badge.group(1)):
+        raise RuntimeError(f"{path} を復元できません: archive.html は{badge.group(1)}号ですが、"
+                           f"カードから復元できたのは{len(entries)}号のみです")
+    # 途中で止まって一部だけのマニフェストが残ると以降の実行がそれを信用するため、全件を一度に書き出す
+    atomic_write(path, ''.join(json.dumps(e, ensure_ascii=False) + '\n' for e in entries))
+
+def render_card(e):
+    tags = ''.join(
+        f"<span class='tag {cls}'>{label}</span>" if cls else f"<span class='card-tag'>{label}</span>"
+        for cls, label in e['tags']
+    )
+    # 一覧では先頭40文字に省略する
+    titles_html = ''.join(f"<li>{t[:40]}{'...' if len(t)>40 else ''}</li>" for t in e['titles'][:3])
+    vs = f"Vol.{e['vol']:03d}"
+    return (
+        f"    <!-- {vs} -->\n"
+        f"    <div class='card'>"
+        f"<div class='card-top'><div class='card-vol'>{vs}</div>"
+        f"<div class='card-date'>{e['date_ja']}</div></div>"
+        f"<div class='card-body'><div class='card-tags'>{tags}</div>"
+        f"<ul class='card-titles'>{titles_html}</ul></div>"
+        f"<div class='card-footer'>"
+        f"<a href='{e['file']}' class='card-link'>▶ この号を読む</a>"
+        f"</div></div>\n"
+    )
+
+def month_of(e):
+    return e['date'][:7]
+
+def month_label(month):
+    y, m = month.split('-')
+    return f"{int(y)}年{int(m)}月"
+
+def month_page(month):
+    return f"archive-{month}.html"
+
+def compact_entry(e):
+    """遅延読込用JSONの1号分（カード描画に必要な項目のみ・タイトルは40文字まで）"""
+    return {
+        'v': e['vol'], 'd': e['date_ja'], 'f': e['file'], 't': e['tags'],
+        'h': [f"{t[:40]}{'...' if len(t)>40 else ''}" for t in e['titles'][:3]],
+    }
+
+# 「さらに前の号」ボタンで archive/index.json と月別JSONを順に読み込む（ページに全号が載っている月は飛ばす）
+ARCHIVE_LOADER_JS = """(function(){
+var btn=document.getElementById('load-more'),grid=document.getElementById('more-grid');
+var shown={},per={},months=null,next=0;
+[].forEach.call(document.querySelectorAll('.card-link'),function(a){var h=a.getAttribute('href'),m=/news-(\\d{4}-\\d{2})/.exec(h);
+shown[h]=1;if(m)per[m[1]]=(per[m[1]]||0)+1;});
+function el(tag,cls,text){var e=document.createElement(tag);if(cls)e.className=cls;if(text)e.textContent=text;return e;}
+function card(x){
+var c=el('div','card'),top=el('div','card-top'),body=el('div','card-body'),tags=el('div','card-tags'),ul=el('ul','card-titles'),ft=el('div','card-footer'),a=el('a','card-link','▶ この号を読む');
+top.appendChild(el('div','card-vol','Vol.'+('00'+x.v).slice(-3)));top.appendChild(el('div','card-date',x.d));
+x.t.forEach(function(t){tags.appendChild(el('span',t[0]?'tag '+t[0]:'card-tag',t[1]));});
+x.h.forEach(function(h){ul.appendChild(el('li','',h));});
+a.href=x.f;ft.appendChild(a);body.appendChild(tags);body.appendChild(ul);
+c.appendChild(top);c.appendChild(body);c.appendChild(ft);return c;}
+function more(){
+if(next>=months.length){btn.style.display='none';return;}
+var m=months[next++];btn.disabled=true;
+fetch(m.data).then(function(r){return r.json();}).then(function(list){
+list.forEach(function(x){if(!shown[x.f]){shown[x.f]=1;grid.appendChild(card(x));}});
+btn.disabled=false;if(next>=months.length)btn.style.display='none';});}
+btn.addEventListener('click',function(){
+if(months){more();return;}
+fetch('""" + ARCHIVE_DATA_DIR + """/index.json').then(function(r){return r.json();}).then(function(d){
+months=d.months.filter(function(m){return (per[m.month]||0)<m.count;});more();});});
+})();"""
+
+# 検索フォーム: 検索語のn-gram（1文字の語はその文字）が属する分割ファイルを各ブロックから読み込み、
+# 全語を含む記事を号の日付（ファイル名）の新しい順に並べてから先頭50件を表示する
+SEARCH_JS = """(function(){
+var form=document.getElementById('search-form'),q=document.getElementById('search-q'),out=document.getElementById('search-results');
+var D='""" + SEARCH_DIR + """/',meta=null,loaded={};
+var RUN=/[a-z0-9]+|[\\u3040-\\u30ff\\u3400-\\u9fff\\uf900-\\ufaff]+/g;
+function get(u){if(!loaded[u])loaded[u]=fetch(D+u).then(function(r){return r.ok?r.json():{};});return loaded[u];}
+function terms(s){var t=[],m;s=s.normalize('NFKC').toLowerCase();RUN.lastIndex=0;
+while((m=RUN.exec(s))){var w=m[0];if(/^[a-z0-9]/.test(w)||w.length<2){t.push(w);}else{for(var i=0;i+1<w.length;i++)t.push(w.substr(i,2));}}
+return t;}
+function ids(t,shard){var r={};for(var k in shard){if(k.lastIndexOf(t,0)===0)shard[k].forEach(function(i){r[i]=1;});}return r;}
+function el(tag,text){var e=document.createElement(tag);if(text)e.textContent=text;return e;}
+function show(docs,total){out.innerHTML='';
+if(!docs.length){out.appendChild(el('li','該当する記事はありません'));return;}
+docs.forEach(function(d){var li=el('li'),a=el('a',d[3]);a.href=d[0];li.appendChild(a);li.appendChild(el('span',d[1]+' | '+d[2]));out.appendChild(li);});
+if(total>docs.length)out.appendChild(el('li','ほか'+(total-docs.length)+'件'));}
+function search(s){var ts=terms(s);if(!ts.length){out.innerHTML='';return;}
+(meta?Promise.resolve(meta):get('meta.json')).then(function(m){meta=m;
+var bs=[];for(var b=0;b*m.block<m.docs;b++)bs.push(b);
+return Promise.all(ts.map(function(t){var f='/t'+('0'+(t.codePointAt(0)%m.shards).toString(16)).slice(-2)+'.json';
+return Promise.all(bs.map(function(b){return get('p'+b+f);}));}));
+}).then(function(shards){var hit=null;
+ts.forEach(function(t,i){var r={};shards[i].forEach(function(sh){var x=ids(t,sh);for(var k in x)r[k]=1;});
+if(hit===null){hit=r;}else{for(var k in hit)if(!r[k])delete hit[k];}});
+var found=Object.keys(hit).map(Number),blocks={};found.forEach(function(i){blocks[Math.floor(i/meta.block)]=1;});
+return Promise.all(Object.keys(blocks).map(function(b){return get('d'+b+'.json').then(function(l){return [b,l];});})).then(function(ls){
+var by={};ls.forEach(function(x){by[x[0]]=x[1];});
+var docs=found.map(function(i){return by[Math.floor(i/meta.block)][i%meta.block];});
+docs.sort(function(a,b){return a[0]<b[0]?1:a[0]>b[0]?-1:0;});show(docs.slice(0,50),docs.length);});});}
+form.addEventListener('submit',function(e){e.preventDefault();search(q.value);});
+})();"""
+
+def render_archive_page(cards_entries, heading, count, hero_sub, latest=None, pager='', loader=False, search=False):
+    """バックナンバーページ共通のHTML。cards_entries は新しい順に並べて渡す"""
+    if latest:
+        lb_sub = ' ／ '.join(t[:20] for t in latest['titles'][:3])
+        banner = (
+            f'  <div class="latest-banner">\n'
+            f'    <div>\n'
+            f'      <div class="lb-label">最新号</div>\n'
+            f'      Vol.{latest["vol"]:03d} | {latest["date_ja"]}\n'
+            f'      <div class="lb-sub">{lb_sub}</div>\n'
+            f'    </div>\n'
+            f'    <a href="index.html" class="lb-btn">今日の記事を読む →</a>\n'
+            f'  </div>\n'
+        )
+    else:
+        banner = ''
+    cards = ''.join(render_card(e) for e in cards_entries)
+    search_box = (
+        '  <form class="search-box" id="search-form"><input id="search-q" type="search" '
+        'placeholder="過去の記事を検索（例：ヤンゴン、ロヒンギャ）"><button>検索</button></form>\n'
+        '  <ul class="search-results" id="search-results"></ul>\n'
+        f'<script>{SEARCH_JS}</script>\n'
+    ) if search else ''
+    more = (
+        '  <div class="grid" id="more-grid"></div>\n'
+        '  <div style="text-align:center;"><button id="load-more" class="lb-btn" '
+        'style="border:none;cursor:pointer;font-family:inherit;">さらに前の号を読み込む</button></div>\n'
+        f'<script>{ARCHIVE_LOADER_JS}</script>\n'
+    ) if loader else ''
+    return f"""<!DOCTYPE html>
+<html lang="ja">
+<head>
+<meta charset="UTF-8">
+<meta http-equiv="Cache-Control" content="no-cache, no-store, must-revalidate">
+<meta http-equiv="Pragma" content="no-cache">
+<meta http-equiv="Expires" content="0">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>ミャンマーニュース | {heading}</title>
+<link href="https://fonts.googleapis.com/css2?family=Noto+Sans+JP:wght@400;500;700;900&display=swap" rel="stylesheet">
+<link rel="stylesheet" href="{stylesheet('archive', ARCHIVE_CSS)}">
+</head>
+<body>
+<header class="header">
+  <div class="header-inner">
+    <div class="logo">ミャンマーニュース</div>
+    <div class="header-right">毎朝8時更新 | ミャンマーと日本をつなぐ</div>
+  </div>
+</header>
+<nav class="nav-bar">
+  <div class="nav-inner">
+    <a href="index.html">▶ 最新号</a>
+    <a href="archive.html" class="active">📚 バックナンバー一覧</a>
+  </div>
+</nav>
+<div class="hero">
+  <div class="hero-inner">
+    <div class="hero-label">BACK NUMBER</div>
+    <h1>{heading}</h1>
+    <div class="hero-sub">{hero_sub}</div>
+  </div>
+</div>
+<div class="wrap">
+{search_box}{banner}  <div class="section-head">
+    <h2>{heading}</h2>
+    <span class="count-badge">{count}号</span>
+  </div>
+  <div class="grid">
+{cards}  </div>
+{more}{pager}</div>
+<footer class="footer">
+  <p>&copy; 2026 ミャンマーニュース | ミャンマーと日本をつなぐ情報誌</p>
+</footer>
+</body>
+</html>
+"""
+
+def render_archive(entries):
+    """
+    トップのバックナンバー一覧（archive.html）。
+    最新ARCHIVE_LATEST_CARDS号のみを載せ、それ以前は月別JSONから遅延読込するため号数に依らず一定サイズ。
+    """
+    latest = entries[-1] if entries else None
+    recent = list(reversed(entries[-ARCHIVE_LATEST_CARDS:]))
+    pager = ''
+    if latest:
+        m = month_of(latest)
+        pager = (f'  <p style="text-align:center;margin-top:24px;font-size:13px;">'
+                 f'<a href="{month_page(m)}" class="card-link">📅 月別バックナンバー（{month_label(m)}〜）</a></p>\n')
+    loader = len(entries) > len(recent)
+    hero_sub = (f'最新{len(recent)}号を掲載しています。それより前の号は「さらに前の号を読み込む」または月別バックナンバーからご覧ください。'
+                if loader else 'Vol.01（2026年7月7日）から最新号まで、全号を掲載しています。')
+    return render_archive_page(
+        recent, 'バックナンバー一覧', len(entries), hero_sub,
+        latest=latest, pager=pager, loader=loader, search=True,
+    )
+
+def render_month_archive(month, month_entries, months):
+    """月別バックナンバーページ。months は全月（新しい順）で、前後の月へのリンクに使う"""
+    i = months.index(month)
+    links = []
+    if i + 1 < len(months):
+        links.append(f'<a href="{month_page(months[i+1])}" class="card-link">← {month_label(months[i+1])}</a>')
+    links.append('<a href="archive.html" class="card-link">📚 一覧トップ</a>')
+    if i > 0:
+        links.append(f'<a href="{month_page(months[i-1])}" class="card-link">{month_label(months[i-1])} →</a>')
+    pager = ('  <p style="display:flex;justify-content:center;gap:24px;margin-top:24px;font-size:13px;">'
+             + ''.join(links) + '</p>\n')
+    return render_archive_page(
+        list(reversed(month_entries)), f'{month_label(month)}のバックナンバー', len(month_entries),
+        f'{month_label(month)}に発行した号の一覧です。', pager=pager,
+    )
+
+def write_archive(entries, months_to_render=None):
+    """
+    archive.html・月別ページ・遅延読込用JSONを書き出す。
+    months_to_render を指定した場合はその月の月別ページとJSONだけを再生成する（前後リンク用に隣の月も含める）。
+    """
+    # 過去日を後から追加した場合もあるため日付順に並べ直す
+    entries = sorted(entries, key=lambda e: (e['date'], e['vol']))
+    by_month = {}
+    for e in entries:
+        by_month.setdefault(month_of(e), []).append(e)
+    months = sorted(by_month, reverse=True)
+    if months_to_render is None:
+        targets = set(months)
+    else:
+        targets = set()
+        for m in months_to_render:
+            if m in by_month:
+                i = months.index(m)
+                targets.update(months[max(0, i-1):i+2])
+
+    os.makedirs(ARCHIVE_DATA_DIR, exist_ok=True)
+    for m in sorted(targets):
+        write_output(month_page(m), render_month_archive(m, by_month[m], months))
+        write_file(os.path.join(ARCHIVE_DATA_DIR, f'{m}.json'),
+                   json.dumps([compact_entry(e) for e in reversed(by_month[m])], ensure_ascii=False,
+                              separators=(',', ':')))
+    index = {
+        'total': len(entries),
+        'months': [{'month': m, 'label': month_label(m), 'count': len(by_month[m]),
+                    'page': month_page(m), 'data': f'{ARCHIVE_DATA_DIR}/{m}.json'} for m in months],
+    }
+    write_file(os.path.join(ARCHIVE_DATA_DIR, 'index.json'),
+               json.dumps(index, ensure_ascii=False, separators=(',', ':')))
+    write_output('archive.html', render_archive(entries))
+
+def manifest_entry(ds, dj, vs, arts, ja_titles):
+    """号のマニフェスト行（カード表示に必要な情報）を作る"""
+    return {
+        'vol': int(re.sub(r'\D', '', vs)),
+        'date': ds,
+        'date_ja': dj,
+        'file': f"news-{ds}.html",
+        'tags': [list(categorize(a['title'], a.get('content', ''))) for a in arts[:3]],
+        'titles': list(ja_titles[:3]),
+    }
+
+def update_archive(ds, dj, vs, arts, ja_titles):
+    """
+    マニフェストに今号を追記し、archive.html と今月分の月別ページをマニフェストから再生成する。
+    出力確定の一部として呼ばれるため、例外は握りつぶさずに呼び出し側へ伝え、号全体を確定させない。
+    """
+    ensure_manifest()
+    href_target = f"news-{ds}.html"
+    entries = read_manifest()
+    if any(e['file'] == href_target for e in entries):
+        print(f"archive: {href_target} 既登録。スキップ。")
+    else:
+        entry = manifest_entry(ds, dj, vs, arts, ja_titles)
+        append_manifest(entry)
+        entries.append(entry)
+        print(f"archive: {vs} カード追加完了")
+
+    write_archive(entries, months_to_render=[ds[:7]])
+    print(f"archive.html更新完了（カード数: {len(entries)}）")
+
+
+# =====================================================================
+# 記事検索インデックス（語の先頭文字で分割した静的JSON）
+# =====================================================================
+
+SEARCH_RUN_RE = re.compile(r'[a-z0-9]+|[\u3040-\u30ff\u3400-\u9fff\uf900-\ufaff]+')
+
+def plain_text(html):
+    return unescape(re.sub(r'<[^>]+>', '', html))
+
+def search_terms(text):
+    """
+    検索語の集合。NFKC正規化・小文字化したうえで、英数字は単語単位、
+    かな・漢字の連続は2文字ずつに分割し、1文字の検索（「軍」で「国軍」など）のため各文字も加える。
+    検索側（SEARCH_JS）は2文字以上の語を2文字ずつ、1文字の語はそのまま引く。
+    """
+    terms = set()
+    for w in SEARCH_RUN_RE.findall(unicodedata.normalize('NFKC', text).lower()):
+        if w.isascii():
+            if len(w) >= 2:
+                terms.add(w)
+        else:
+            terms.update(w)
+            terms.update(w[i:i+2] for i in range(len(w) - 1))
+    return terms
+
+def search_shard_path(term, block):
+    """記事番号のブロック（SEARCH_DOC_BLOCK件ごと）・語の先頭文字ごとのポスティングファイル"""
+    return os.path.join(SEARCH_DIR, f'p{block}', f't{ord(term[0]) % SEARCH_SHARDS:02x}.json')
+
+def load_search_state():
+    """検索インデックスの meta.json と登録済みの号の一覧。形式が古い場合は空から作り直す"""
+    meta = _load_json(os.path.join(SEARCH_DIR, 'meta.json'), None)
+    if not meta or meta.get('version') != SEARCH_INDEX_VERSION:
+        if meta:
+            print("検索インデックスの形式が古いため作り直します（過去号は --rebuild で再登録）")
+        return {'version': SEARCH_INDEX_VERSION, 'docs': 0, 'shards': SEARCH_SHARDS,
+                'block': SEARCH_DOC_BLOCK}, []
+    return meta, _load_json(os.path.join(SEARCH_DIR, 'indexed.json'), [])
+
+def _load_json(path, default):
+    data = read_current(path)
+    try:
+        return json.loads(data.decode('utf-8')) if data else default
+    except ValueError:
+        return default
+
+def _dump_json(path, data):
+    write_file(path, json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+
+def manifest_search_issue(e):
+    """号データの無い号（手作りの初期号など）を、マニフェストのタイトルだけで検索対象にする"""
+    return {
+        'file': e['file'], 'vol': f"Vol.{e['vol']:03d}", 'date_ja': e['date_ja'],
+        'articles': [{'ja_title': t, 'ja_body': '', 'points': []} for t in e['titles']],
+    }
+
+def update_search_index(issues):
+    """
+    号データ（タイトル・本文・解説）を検索インデックスに追加する。登録済みの号は飛ばす。
+    記事は通し番号で search/dN.json（SEARCH_DOC_BLOCK件ずつ）に、語→記事番号のポスティングは
+    同じ番号ブロックごとに語の先頭文字で振り分けた search/pN/tXX.json に追記する。
+    書き直すのは最新ブロックの分割ファイルだけなので、1号あたりの変更量は
+    インデックス全体ではなく1ブロック分の大きさで頭打ちになる（古いブロックは以後変わらない）。
+    """
+    meta_path = os.path.join(SEARCH_DIR, 'meta.json')
+    indexed_path = os.path.join(SEARCH_DIR, 'indexed.json')
+    meta, indexed = load_search_state()
+    known = set(indexed)
+    n = meta['docs']
+    postings, blocks = {}, {}
+    for issue in issues:
+        if issue['file'] in known:
+            continue
+        for art in issue['articles']:
+            title = plain_text(art['ja_title'])
+            text = ' '.join([title, plain_text(art['ja_body'])]
+                            + [plain_text(t) + ' ' + plain_text(p) for t, p in art['points']])
+            for term in search_terms(text):
+                postings.setdefault(search_shard_path(term, n // SEARCH_DOC_BLOCK), {}).setdefault(term, []).append(n)
+            blocks.setdefault(n // SEARCH_DOC_BLOCK, []).append(
+                [issue['file'], issue['vol'], issue['date_ja'], title])
+            n += 1
+        indexed.append(issue['file'])
+        known.add(issue['file'])
+    if n == meta['docs']:
+        return 0
+
+    for b, docs in blocks.items():
+        path = os.path.join(SEARCH_DIR, f'd{b}.json')
+        _dump_json(path, _load_json(path, []) + docs)
+    for path, terms in postings.items():
+        shard = _load_json(path, {})
+        for term, ids in terms.items():
+            shard.setdefault(term, []).extend(ids)
+        _dump_json(path, shard)
+    added = n - meta['docs']
+    meta['docs'] = n
+    _dump_json(meta_path, meta)
+    _dump_json(indexed_path, indexed)
+    print(f"検索インデックス: {added}記事追加（全{n}記事 / 分割ファイル更新 {len(postings)}件）")
+    return added
+
+
+# =====================================================================
+# 号データの保存と静的サイトの差分再生成
+# =====================================================================
+
+# 号ごとの入力データ（選定記事・翻訳・解説）を issues/news-YYYY-MM-DD.json に保存する
+ISSUE_DATA_DIR = 'issues'
+BUILD_STATE = os.path.join(CACHE_DIR, 'site-build.json')
+
+def issue_data_path(page):
+    return os.path.join(ISSUE_DATA_DIR, os.path.splitext(os.path.basename(page))[0] + '.json')
+
+def save_issue_data(issue):
+    write_file(issue_data_path(issue['file']), json.dumps(issue, ensure_ascii=False, indent=1))
+
+def load_issue_data(page):
+    with open(issue_data_path(page), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def issue_data_from_html(path):
+    """
+    生成スクリプト（v3テンプレート）で作られた既存の号ページから号データを復元する。
+    手作りの初期号など、テンプレートと構造が異なるページは None を返す。
+    """
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        soup = BeautifulSoup(f.read(), 'lxml')
+    vol = soup.select_one('.hero .vol')
+    note = soup.select_one('.editor-note p')
+    arts = soup.select('div.article')
+    if not vol or not note or not arts or '　|　' not in vol.get_text():
+        return None
+    vs, dj = vol.get_text().split('　|　', 1)
+    label = soup.select_one('.editor-note .en-label')
+    if not label or label.get_text() != '本日のまとめ':
+        return None
+    records = []
+    for art in arts:
+        tag = art.select_one('.art-meta .tag')
+        title = art.select_one('.art-title')
+        body = art.select_one('.art-news')
+        link = art.select_one('a.art-link')
+        src = art.select_one('.art-src')
+        date = art.select_one('.art-date')
+        points = art.select('.kaisetsu .k-point')
+        if not (tag and title and body and link and src and date) or len(points) != 3:
+            return None
+        # 日付・出典・リンク文言が生成テンプレートと一致しないページは対象外
+        source = src.get_text().replace('出典：', '').split('　')[0]
+        if (date.get_text() != dj or src.get_text() != f"出典：{source}　{dj}"
+                or link.get_text() != f"→ {source} 原記事を読む"):
+            return None
+        # 本文・解説が1段落のテキストであることを確認（複数段落の手作りページは対象外）
+        if body.find(True) or any(len(p.find_all('p')) != 1 or p.find('p').find(True) for p in points):
+            return None
+        cls = [c for c in tag.get('class', []) if c != 'tag']
+        records.append({
+            'title_en': '', 'url': link.get('href', ''),
+            'source': source,
+            'tag': [cls[0] if cls else 'tc', tag.get_text(strip=True)],
+            'ja_title': title.decode_contents(), 'ja_body': body.decode_contents(),
+            'points': [[p.select_one('.k-point-title').decode_contents(), p.find('p').decode_contents()]
+                       for p in points],
+        })
+    m = re.search(r'news-(\d{4}-\d{2}-\d{2})', os.path.basename(path))
+    return {
+        'date': m.group(1) if m else '', 'date_ja': dj.strip(), 'vol': vs.strip(),
+        'file': os.path.basename(path), 'summary': note.decode_contents(), 'articles': records,
+    }
+
+def import_legacy_issues():
+    """号データが無い既存ページのうち、テンプレート互換のものを号データとして取り込む"""
+    imported, skipped = [], []
+    for name in sorted(os.listdir('.')):
+        if not re.fullmatch(r'news-\d{4}-\d{2}-\d{2}\.html', name) or os.path.exists(issue_data_path(name)):
+            continue
+        issue = issue_data_from_html(name)
+        if issue:
+            save_issue_data(issue)
+            imported.append(name)
+        else:
+            skipped.append(name)
+    return imported, skipped
+
+def _fingerprint(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode('utf-8') if isinstance(part, str) else part)
+        h.update(b'\x1f')
+    return h.hexdigest()
+
+def template_fingerprints():
+    """テンプレート（描画関数のソース）とCSSの内容ハッシュ。変わると依存ページが再生成対象になる"""
+    import inspect
+    src = lambda *fns: ''.join(inspect.getsource(f) for f in fns)
+    return {
+        'issue': _fingerprint(src(render_issue_page, render_article_block, minify_css), CSS),
+        'archive': _fingerprint(src(render_archive_page, render_archive, render_month_archive,
+                                    render_card, compact_entry, minify_css), ARCHIVE_CSS, ARCHIVE_LOADER_JS, SEARCH_JS),
+    }
+
+def _render_issue_job(job):
+    """ワーカープロセスで号ページを1つ再生成する"""
+    page, data_path, also_index = job
+    with open(data_path, 'r', encoding='utf-8') as f:
+        html = render_issue_page(json.load(f))
+    write_output(page, html)
+    if also_index:
+        write_output('index.html', html)
+    return page
+
+def index_back_catalogue(pages):
+    """
+    検索インデックス未登録の号を日付順に追加する（pages は issues/ 内の号データのファイル名）。
+    号データを復元できない号はマニフェストのタイトルだけ載せる。
+    """
+    known = set(load_search_state()[1])
+    with_data = {f[:-5] + '.html' for f in pages}
+    issues = [load_issue_data(f[:-5] + '.html') for f in pages if f[:-5] + '.html' not in known]
+    issues += [manifest_search_issue(e) for e in read_manifest()
+               if e['file'] not in with_data and e['file'] not in known]
+    return update_search_index(sorted(issues, key=lambda i: i['file']))
+
+def rebuild_site(jobs=None, force=False):
+    """
+    号データ・テンプレート・CSS の内容ハッシュを前回の生成時と比較し、
+    入力が変わったページだけをワーカープロセスで並列に再生成する。
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    imported, skipped = import_legacy_issues()
+    if imported:
+        print(f"既存ページから号データを取り込み: {len(imported)}件")
+    if skipped:
+        print(f"テンプレート非互換のため対象外: {', '.join(skipped)}")
+
+    try:
+        state = json.load(open(BUILD_STATE, 'r', encoding='utf-8'))
+    except (OSError, ValueError):
+        state = {}
+    fp = template_fingerprints()
+    # CSSファイルは親プロセスで一度だけ書き出す
+    stylesheet('news', CSS)
+    stylesheet('archive', ARCHIVE_CSS)
+
+    pages = sorted(f for f in os.listdir(ISSUE_DATA_DIR) if f.endswith('.json')) if os.path.isdir(ISSUE_DATA_DIR) else []
+    index_back_catalogue(pages)
+    latest = max(pages) if pages else None
+    new_state, todo = {}, []
+    for name in pages:
+        data_path = os.path.join(ISSUE_DATA_DIR, name)
+        page = name[:-5] + '.html'
+        key = _fingerprint(fp['issue'], open(data_path, 'rb').read())
+        new_state[page] = key
+        is_latest = name == latest
+        if is_latest:
+            new_state['index.html'] = key
+        if force or state.get(page) != key or not os.path.exists(page) \
+                or (is_latest and state.get('index.html') != key):
+            todo.append((page, data_path, is_latest))
+
+    jobs = jobs or os.cpu_count() or 1
+    if todo:
+        if jobs > 1 and len(todo) > 1:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(todo))) as ex:
+                done = list(ex.map(_render_issue_job, todo, chunksize=max(1, len(todo) // (jobs * 4))))
+        else:
+            done = [_render_issue_job(j) for j in todo]
+        print(f"号ページ再生成: {len(done)}件 / 全{len(pages)}件")
+    else:
+        print(f"号ページ: 変更なし（全{len(pages)}件）")
+
+    manifest_key = _fingerprint(fp['archive'], open(MANIFEST, 'rb').read() if os.path.exists(MANIFEST) else b'')
+    new_state['archive'] = manifest_key
+    if force or state.get('archive') != manifest_key:
+        write_archive(read_manifest())
+        print("バックナンバー一覧を再生成")
+
+    removed = prune_stale_assets()
+    if removed:
+        print(f"参照されなくなったCSSを削除: {removed}件")
+
+    os.makedirs(os.path.dirname(BUILD_STATE) or '.', exist_ok=True)
+    with open(BUILD_STATE, 'w', encoding='utf-8') as f:
+        json.dump(new_state, f, indent=1)
+    return len(todo)
+
+# =====================================================================
+# メイン処理
+# =====================================================================
+
+def select_articles(feed, used, history=None):
+    """
+    フィードの全記事から未使用の記事を rank_candidates で採点して最大3本選ぶ
+    （足りなければ使用済みも含めて補完）。詳細取得・翻訳は選ばれた記事だけに行う。
+    history は新規性の比較対象にするタイトルのリスト（省略時は使用済み履歴の直近分）。
+    """
+    # 全候補を比べて順位付けするため、iter_dvb_feed の「3本選んだ時点で解析を打ち切る」早期終了は使わない。
+    # フィードは数十件・1リクエスト分で解析も数ミリ秒のため、その分の時間より選定の質を優先する
+    items = list(feed)
+    cands = []
+    for a in items:
+        if len(a['title']) < 15:
+            continue
+        if is_used(a['title'], used):
+            STATS.incr('selection.skipped_used')
+            continue
+        cands.append(a)
+    if history is None:
+        history = recent_history_titles()
+    selected = rank_candidates(cands, history)
+
+    # フォールバック: 使用済みも含めて補完（フィードの順）
+    if len(selected) < 3:
+        for a in items:
+            if len(selected) >= 3:
+                break
+            if a not in selected:
+                selected.append(a)
+                STATS.incr('selection.fallback')
+                print(f"選定(FB)[{len(selected)}]: {a['title'][:60]}")
+    STATS.incr('selection.feed_items_parsed', len(items))
+    return selected[:3]
+
+def produce_issue(ds, dj, vs, selected, journal):
+    """
+    選定済み記事の詳細取得・翻訳・解説生成を行い、号データを保存して号ページを書き出す。
+    記事ごとの各段階の結果は journal に記録し、記録済みの段階は実行しない。
+    """
+    out = f"news-{ds}.html"
+
+    # 詳細本文が不足している記事は記事URLにアクセスして並列取得
+    with STATS.stage('detail'):
+        for i, a in enumerate(selected):
+            if journal.get(i, 'content') is not None:
+                a['content'] = journal.get(i, 'content')
+        fetch_details(selected, deadline=BUDGET.stage_deadline(DETAIL_BUDGET_SHARE))
+        for i, a in enumerate(selected):
+            if journal.get(i, 'content') is None:
+                journal.put(i, 'content', a.get('content', ''))
+
+    # 記事ごとの翻訳セグメント（各5セグメント）を並列に一括翻訳
+    print("\n--- 一括翻訳中 ---")
+    with STATS.stage('translation'):
+        todo = [i for i in range(len(selected)) if journal.get(i, 'translation') is None]
+        if len(todo) < len(selected):
+            STATS.incr('journal.resumed_translations', len(selected) - len(todo))
+            print(f"翻訳済み（前回の実行から再開）: {len(selected) - len(todo)}記事")
+        if todo:
+            # タイトル・本文（必須）は予算いっぱいまで、解説3ポイント（任意）は早めに締め切る
+            required = BUDGET.stage_deadline()
+            optional = BUDGET.optional_deadline(len(todo))
+            translate_articles([article_segments(selected[i]) for i in todo],
+                               done=lambda k, t: journal.put(todo[k], 'translation', t),
+                               deadlines=[required, required, optional, optional, optional])
+        translations = [journal.get(i, 'translation') for i in range(len(selected))]
+
+    # 各記事の表示データを生成し、号データとして保存してからHTML化
+    print("\n--- 記事HTML生成中 ---")
+    with STATS.stage('render'):
+        records = []
+        for i, a in enumerate(selected):
+            print(f"\n[記事{i+1}/{len(selected)}] {a['title'][:50]}")
+            if journal.get(i, 'record') is None:
+                journal.put(i, 'record', build_article_record(a, dj, translations[i]))
+            records.append(journal.get(i, 'record'))
+        issue = {
+            'date': ds, 'date_ja': dj, 'vol': vs, 'file': out,
+            'summary': issue_summary([r['ja_title'] for r in records]), 'articles': records,
+        }
+        save_issue_data(issue)
+        html = render_issue_page(issue)
+
+    write_output(out, html)
     print(f"\n{out} 保存完了 ({len(html)} bytes)")
-    shutil.copy(out, 'index.html')
-    print("index.html更新完了")
+    return issue, html
+
+def append_used(ds, arts, history):
+    """今号の記事を使用済み履歴に追記する（重複判定インデックスとログの圧縮は確定後に行う）"""
+    history.append([history_record(ds, a) for a in arts])
+    print("使用済み履歴に追記")
+
+# =====================================================================
+# 実行ジャーナル（段階ごとのチェックポイントと途中再開）
+# =====================================================================
+
+class RunJournal:
+    """
+    1号分の生成の進み具合（選定記事と、記事ごとの本文・翻訳・表示データ）を
+    .cache/journal-YYYY-MM-DD.json に段階ごとに記録する。
+    途中で止まった号を再実行すると、記録済みの段階を飛ばして続きから処理する。
+    """
+
+    def __init__(self, ds):
+        self.path = os.path.join(CACHE_DIR, f'journal-{ds}.json')
+        self.lock = threading.Lock()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+        except (OSError, ValueError):
+            self.data = {}
+
+    def resume(self, vs):
+        """同じ号数で途中まで進んだ記録があれば、その選定記事を返す"""
+        if self.data.get('vol') == vs and self.data.get('selected'):
+            return self.data['selected']
+        return None
+
+    def begin(self, vs, selected):
+        """選定結果を記録する。前回と同じ号数・同じ記事なら記事ごとの進捗を引き継ぐ"""
+        urls = [a['url'] for a in selected]
+        if self.data.get('vol') != vs or [a['url'] for a in self.data.get('selected', [])] != urls:
+            self.data = {'vol': vs, 'articles': [{} for _ in selected]}
+        self.data['selected'] = selected
+        self.save()
+
+    def get(self, i, stage):
+        return self.data['articles'][i].get(stage)
+
+    def put(self, i, stage, value):
+        with self.lock:
+            self.data['articles'][i][stage] = value
+            self.save()
+
+    def save(self):
+        if CACHE_DISABLED:
+            return
+        try:
+            atomic_write(self.path, json.dumps(self.data, ensure_ascii=False))
+        except OSError as e:
+            print(f"ジャーナル保存エラー: {e}")
 
-    update_archive(ds, dj, vs, selected[:3], ja_titles)
+    def finish(self):
+        """号の出力を確定したら記録を消す"""
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
 
-    # used-news.txt更新
-    cur = open('used-news.txt', 'r', encoding='utf-8').read()
-    add = ''.join(f"\n{ds}|{a['title'][:80]}" for a in selected[:3])
-    open('used-news.txt', 'w', encoding='utf-8').write(cur + add)
-    print("used-news.txt更新完了")
+def generate_issue():
+    """今日の号を生成する。戻り値は実行結果の状態（ok / exists / no_articles）"""
+    ds, dj = get_date_info()
+    vn = get_next_vol()
+    vs = f"Vol.{vn:03d}"
+    print(f"日付: {ds} / {dj} / {vs}")
+    STATS.meta.update({'date': ds, 'vol': vs})
+
+    out = f"news-{ds}.html"
+    if os.path.exists(out):
+        print(f"{out} 既存。終了。")
+        return 'exists'
+
+    journal = RunJournal(ds)
+    with STATS.stage('selection'):
+        selected = journal.resume(vs)
+        if selected:
+            print(f"前回の途中から再開: {len(selected)}記事")
+            STATS.incr('journal.resumed')
+        else:
+            history = HistoryStore.load()
+            selected = select_articles(iter_dvb_feed(), DedupIndex.load(history),
+                                       recent_history_titles(history=history))
+
+    if not selected:
+        print("ERROR: 記事取得失敗。終了。")
+        return 'no_articles'
+    journal.begin(vs, selected)
+
+    # 号ページ・index.html・バックナンバー・検索インデックス・使用済み履歴はまとめて確定する
+    with output_transaction():
+        issue, html = produce_issue(ds, dj, vs, selected, journal)
+        ja_titles = [r['ja_title'] for r in issue['articles']]
+        STATS.meta['articles'] = [{'title': a['title'], 'url': a['url'], 'ja_title': t}
+                                  for a, t in zip(selected, ja_titles)]
+        write_output('index.html', html)
+        print("index.html更新完了")
+
+        with STATS.stage('archive'):
+            update_archive(ds, dj, vs, selected, ja_titles)
+        with STATS.stage('search'):
+            update_search_index([issue])
+
+        # 使用済み履歴の更新
+        with STATS.stage('history'):
+            history = HistoryStore.load()
+            append_used(ds, selected, history)
+    journal.finish()
+    with STATS.stage('history'):
+        history.maybe_compact()
+        DedupIndex.load(history).save()
+    with STATS.stage('cache_prune'):
+        removed = translation_cache.prune()
+        print(f"翻訳キャッシュ: {translation_cache.stats()} / 削除 {removed}件")
+        print(f"HTTPキャッシュ: 削除 {prune_http_cache()}件")
     print(f"\n=== 完了: {vs} ({dj}) ===")
+    return 'ok'
+
+# =====================================================================
+# バックフィル（過去日の欠号をまとめて生成）
+# =====================================================================
+
+def backfill(start, end, feed_dir, workers=None):
+    """
+    start〜end（YYYY-MM-DD）のうち号ページが無い日を、feed_dir/YYYY-MM-DD.xml の
+    フィードスナップショットから1プロセスでまとめて生成する。
+
+    1. 日付順に記事を選定し、号数を割り当てる（選んだ記事は以降の日の重複判定に即反映）
+    2. 各日の取得・翻訳・ページ生成を並列に実行（HTTP接続・翻訳キャッシュは共有）
+    3. 日付順にマニフェスト・使用済み履歴へ登録し、バックナンバーを一度だけ再生成
+
+    号数は発行順の通し番号で、発行済みの号の番号は変えない。過去日を埋めた号にも
+    現在の最新号の次の番号を日付の古い順に振る（例: 最新がVol.045のとき、7/13を埋めた号はVol.046）。
+    バックナンバー一覧は日付順に並ぶため、埋めた号はその日付の位置に大きい号数で表示される。
+    """
+    recover_pending_commit()
+    d0 = datetime.datetime.strptime(start, '%Y-%m-%d')
+    d1 = datetime.datetime.strptime(end, '%Y-%m-%d')
+    store = HistoryStore.load()
+    used = DedupIndex.load(store)
+    history = recent_history_titles(history=store)
+    ensure_manifest()
+    last = last_manifest_entry()
+    next_vol = last['vol'] + 1 if last else 14
+
+    plans = []
+    d = d0
+    while d <= d1:
+        ds, dj = get_date_info(d)
+        d += datetime.timedelta(days=1)
+        snapshot = os.path.join(feed_dir, f"{ds}.xml")
+        if os.path.exists(f"news-{ds}.html"):
+            print(f"{ds}: 既存。スキップ。")
+            continue
+        if not os.path.exists(snapshot):
+            print(f"{ds}: フィードスナップショット無し（{snapshot}）。スキップ。")
+            continue
+        print(f"\n{ds}: 記事選定")
+        with open(snapshot, 'rb') as f:
+            data = f.read()
+        selected = select_articles(iter_feed_items(data), used, history)
+        if not selected:
+            print(f"{ds}: 記事無し。スキップ。")
+            continue
+        for a in selected:
+            used.add(f"{ds}|{a['title'][:80]}")
+            history.append(a['title'][:80])
+        journal = RunJournal(ds)
+        journal.begin(f"Vol.{next_vol:03d}", selected)
+        plans.append((ds, dj, f"Vol.{next_vol:03d}", selected, journal))
+        next_vol += 1
+
+    if not plans:
+        print("バックフィル対象の日がありません。")
+        return []
+
+    workers = workers or MAX_WORKERS
+    print(f"\n--- {len(plans)}日分を並列生成（最大{workers}並列） ---")
+    with output_transaction():
+        with ThreadPoolExecutor(max_workers=min(workers, len(plans))) as ex:
+            issues = list(ex.map(lambda p: produce_issue(*p)[0], plans))
+
+        # マニフェスト・使用済み履歴への登録は日付順に直列で行う
+        entries = read_manifest()
+        known = {e['file'] for e in entries}
+        for (ds, dj, vs, selected, _), issue in zip(plans, issues):
+            if issue['file'] not in known:
+                entry = manifest_entry(ds, dj, vs, selected, [r['ja_title'] for r in issue['articles']])
+                append_manifest(entry)
+                entries.append(entry)
+            append_used(ds, selected, store)
+        write_archive(entries)
+        update_search_index(issues)
+
+        # 最新号より新しい日を埋めた場合だけ index.html を差し替える
+        latest = max(entries, key=lambda e: e['date'])
+        for issue in issues:
+            if issue['file'] == latest['file']:
+                write_output('index.html', render_issue_page(issue))
+    for plan in plans:
+        plan[-1].finish()
+    store.maybe_compact()
+    DedupIndex.load(store).save()
+    translation_cache.prune()
+    print(f"\n=== バックフィル完了: {', '.join(f'{p[0]}({p[2]})' for p in plans)} ===")
+    print(f"翻訳キャッシュ: {translation_cache.stats()}")
+    return issues
+
+def write_run_report(status, profiler=None):
+    """
+    実行レポート（と cProfile の結果）を reports/news-YYYY-MM-DD.json に書き出す。
+    号を生成した実行のレポートは、その後の再実行で上書きしない。既存で終了しただけの実行は記録せず、
+    それ以外（エラー等）は時刻付きの別名で残す。
+    """
+    name = f"news-{STATS.meta.get('date', get_date_info()[0])}"
+    path = os.path.join(REPORT_DIR, name + '.json')
+    if status != 'ok' and os.path.exists(path):
+        if status == 'exists':
+            print(f"実行レポート: 既存の {path} を保持")
+            return
+        name += f"-{status}-{time.strftime('%H%M%S')}"
+        path = os.path.join(REPORT_DIR, name + '.json')
+    try:
+        if profiler:
+            prof_path = os.path.join(REPORT_DIR, name + '.prof')
+            os.makedirs(REPORT_DIR, exist_ok=True)
+            profiler.dump_stats(prof_path)
+            top = pstats.Stats(profiler).sort_stats('cumulative')
+            STATS.meta['profile'] = prof_path
+            STATS.meta['profile_top'] = [
+                f"{fn[0].split(os.sep)[-1]}:{fn[1]}({fn[2]}) {st[3]:.3f}s"
+                for fn, st in sorted(top.stats.items(), key=lambda kv: -kv[1][3])[:15]
+            ]
+        STATS.write(path)
+        print(f"実行レポート: {path}")
+    except OSError as e:
+        print(f"実行レポート保存エラー: {e}")
+
+def main():
+    print("=== ミャンマーニュース自動生成 v3.0 ===")
+    print("品質基準: 記事固有の詳細解説 / 汎用テンプレート禁止")
+    profiler = cProfile.Profile() if PROFILE else None
+    status = 'error'
+    try:
+        if profiler:
+            profiler.enable()
+        recover_pending_commit()
+        BUDGET.start(RUN_BUDGET_SECONDS)
+        status = generate_issue()
+    finally:
+        if profiler:
+            profiler.disable()
+        STATS.meta['status'] = status
+        if BUDGET.deadline is not None:
+            STATS.meta['budget_left_seconds'] = round(BUDGET.remaining(), 1)
+        STATS.counters['translate.cache_hits'] = translation_cache.hits
+        STATS.counters['translate.cache_misses'] = translation_cache.misses
+        write_run_report(status, profiler)
 
 if __name__ == '__main__':
-    main()
+    import argparse
+    ap = argparse.ArgumentParser(description='ミャンマーニュース自動生成')
+    ap.add_argument('--rebuild', action='store_true',
+                    help='号データから既存ページを再生成する（入力が変わったページのみ）')
+    ap.add_argument('--force', action='store_true', help='--rebuild で全ページを再生成する')
+    ap.add_argument('--jobs', type=int, default=None, help='--rebuild / --backfill の並列数')
+    ap.add_argument('--backfill', nargs=2, metavar=('START', 'END'),
+                    help='START〜END（YYYY-MM-DD）の欠号をフィードスナップショットから生成する。'
+                         '号数は発行済みの号を変えず、最新号の次から日付順に振る')
+    ap.add_argument('--feed-dir', default='feed-snapshots',
+                    help='--backfill で使うフィードスナップショット（YYYY-MM-DD.xml）のディレクトリ')
+    args = ap.parse_args()
+    if args.backfill:
+        backfill(args.backfill[0], args.backfill[1], args.feed_dir, workers=args.jobs)
+    elif args.rebuild:
+        rebuild_site(jobs=args.jobs, force=args.force)
+    else:
+        main()